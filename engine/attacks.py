@@ -76,4 +76,40 @@ def king_attacks_from(sq: int) -> int:
 
 # Precompute attacks for every square
 KNIGHT_ATTACKS = [knight_attacks_from(sq) for sq in range(64)]
-KING_ATTACKS = [king_attacks_from(sq) for sq in range(64)]
\ No newline at end of file
+KING_ATTACKS = [king_attacks_from(sq) for sq in range(64)]
+
+def pawn_attacks_from(sq: int, white: bool) -> int:
+    bb = 1 << sq
+    if white:
+        return _mask64(((bb & NOT_FILE_A) << 7) | ((bb & NOT_FILE_H) << 9))
+    return ((bb & NOT_FILE_A) >> 9) | ((bb & NOT_FILE_H) >> 7)
+
+# PAWN_ATTACKS[0][sq] = squares a white pawn on sq attacks, PAWN_ATTACKS[1][sq] for black.
+# Read the other way round, PAWN_ATTACKS[0][sq] is where black pawns attacking sq stand.
+PAWN_ATTACKS = [
+    [pawn_attacks_from(sq, True) for sq in range(64)],
+    [pawn_attacks_from(sq, False) for sq in range(64)],
+]
+
+# File and rank masks by index, for pawn structure evaluation
+FILE_MASKS = [FILE_A << f for f in range(8)]
+RANK_MASKS = [RANK_1 << (8 * r) for r in range(8)]
+
+# Files either side of a file (one of them for the a and h files)
+ADJACENT_FILE_MASKS = [
+    (FILE_MASKS[f - 1] if f > 0 else 0) | (FILE_MASKS[f + 1] if f < 7 else 0)
+    for f in range(8)
+]
+
+# FORWARD_RANKS[0][r] = every rank in front of rank r from white's side, [1][r] from black's
+FORWARD_RANKS = [
+    [sum(RANK_MASKS[r + 1:]) for r in range(8)],
+    [sum(RANK_MASKS[:r]) for r in range(8)],
+]
+
+# PASSED_PAWN_MASKS[color][sq] = squares in front of a pawn on sq, on its own
+# and the adjacent files. A pawn with no enemy pawns there is passed.
+PASSED_PAWN_MASKS = [
+    [(FILE_MASKS[sq % 8] | ADJACENT_FILE_MASKS[sq % 8]) & FORWARD_RANKS[color][sq // 8] for sq in range(64)]
+    for color in range(2)
+]
@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+
 FILES = "abcdefgh"
 RANKS = "12345678"
 
@@ -34,13 +36,29 @@ def clear_bit(bb: int, sq: int) -> int:
 def is_set(bb: int, sq: int) -> bool:
     return (bb >> sq) & 1 == 1
 
-def pop_lsb(bb: int) -> tuple[int, int]:
-    # This is a bit of bit magic, hurts my brain a bit but all you need to know is
-    # only the lowest set bit survives the &
-    lsb = bb & -bb
-    # Bit length is how many bits do we need to store lsb
-    # so 0b000..1000 will be 4 bits. Subtract 1 to get 3rd position sq
-    sq = lsb.bit_length() - 1
-    # Exclusive OR to pop bit
-    bb ^= lsb
-    return sq, bb
\ No newline at end of file
+# SQUARE_BB[sq] = bit(sq), a list lookup instead of a shift in hot loops
+SQUARE_BB = [1 << sq for sq in range(64)]
+
+# Number of set bits. int.bit_count is Python 3.10+, older versions count
+# the 1s in the binary string, which still beats clearing bits one at a time.
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:
+    def popcount(bb: int) -> int:
+        return bin(bb).count("1")
+
+def lsb(bb: int) -> int:
+    """Index of the lowest set bit. bb must not be empty."""
+    # Only the lowest set bit survives the &
+    return (bb & -bb).bit_length() - 1
+
+def msb(bb: int) -> int:
+    """Index of the highest set bit. For a single-bit board (a king) this is its square."""
+    return bb.bit_length() - 1
+
+def squares(bb: int) -> Iterator[int]:
+    """Yield the index of every set bit, lowest first, without building a tuple per bit."""
+    while bb:
+        lsb_bb = bb & -bb
+        yield lsb_bb.bit_length() - 1
+        bb ^= lsb_bb
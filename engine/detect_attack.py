@@ -1,9 +1,13 @@
-from engine.bitboard import pop_lsb
 from .position import Position, PIECE_TO_INDEX
-from .attacks import KNIGHT_ATTACKS, KING_ATTACKS
+from .attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS
 from .sliders import rook_attacks, bishop_attacks
 
-def is_square_attacked(pos: Position, sq: int, by_side: str) -> bool:
+def is_square_attacked(pos: Position, sq: int, by_side: str, occ: int | None = None) -> bool:
+    # occ overrides the board occupancy for slider attacks, e.g. with the king
+    # taken off the board so it can't block an attack on the square behind it
+    if occ is None:
+        occ = pos.all_occ
+
     if by_side == "w":
         pawns = pos.pieces[PIECE_TO_INDEX["P"]]
         knights = pos.pieces[PIECE_TO_INDEX["N"]]
@@ -11,6 +15,8 @@ def is_square_attacked(pos: Position, sq: int, by_side: str) -> bool:
         rooks = pos.pieces[PIECE_TO_INDEX["R"]]
         queens = pos.pieces[PIECE_TO_INDEX["Q"]]
         king = pos.pieces[PIECE_TO_INDEX["K"]]
+        # White pawns attacking sq stand where a black pawn on sq would attack
+        pawn_sources = PAWN_ATTACKS[1][sq]
     else:
         pawns = pos.pieces[PIECE_TO_INDEX["p"]]
         knights = pos.pieces[PIECE_TO_INDEX["n"]]
@@ -18,38 +24,26 @@ def is_square_attacked(pos: Position, sq: int, by_side: str) -> bool:
         rooks = pos.pieces[PIECE_TO_INDEX["r"]]
         queens = pos.pieces[PIECE_TO_INDEX["q"]]
         king = pos.pieces[PIECE_TO_INDEX["k"]]
+        pawn_sources = PAWN_ATTACKS[0][sq]
 
     if KNIGHT_ATTACKS[sq] & knights:
         return True
-    
+
     if KING_ATTACKS[sq] & king:
         return True
-    
-    if rook_attacks(sq, pos.all_occ) & (rooks | queens):
+
+    # Pawn attacks
+    if pawn_sources & pawns:
         return True
-    
-    if bishop_attacks(sq, pos.all_occ) & (bishops | queens):
+
+    # Only look up slider attacks if there are sliders that could use them
+    rook_like = rooks | queens
+    if rook_like and rook_attacks(sq, occ) & rook_like:
         return True
-    
-    # Pawn attacks
-    if by_side == "w":
-        # White pawns attack upward, so they attack sq from below-left and below-right
-        # If sq is attacked by white pawn, the pawn is on sq-7 or sq-9
-        attackers = 0
-        if sq >= 9 and (sq % 8) != 0:  # Not on a-file, can be attacked from left
-            attackers |= 1 << (sq - 9)
-        if sq >= 7 and (sq % 8) != 7:  # Not on h-file, can be attacked from right
-            attackers |= 1 << (sq - 7)
-        if pawns & attackers:
-            return True
-    else:
-        # Black pawns attack downward, so they attack sq from above-left and above-right
-        attackers = 0
-        if sq <= 54 and (sq % 8) != 7:  # Not on h-file
-            attackers |= 1 << (sq + 9)
-        if sq <= 56 and (sq % 8) != 0:  # Not on a-file
-            attackers |= 1 << (sq + 7)
-        if pawns & attackers:
-            return True
-
-    return False
\ No newline at end of file
+
+    bishop_like = bishops | queens
+    if bishop_like and bishop_attacks(sq, occ) & bishop_like:
+        return True
+
+    return False
+
@@ -1,5 +1,10 @@
-from .position import PIECE_TO_INDEX, Position
-from .bitboard import pop_lsb
+from .position import PIECE_TO_INDEX, Position, WHITE, BLACK
+from .bitboard import popcount, squares, msb
+from .attacks import (
+    KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, NOT_FILE_A, NOT_FILE_H, MASK64,
+    FILE_MASKS, ADJACENT_FILE_MASKS, FORWARD_RANKS, PASSED_PAWN_MASKS,
+)
+from .sliders import bishop_attacks, rook_attacks
 
 # Piece values in centipawns (1 pawn = 100)
 PIECE_VALUES = {
@@ -86,12 +91,59 @@ KING_MIDDLEGAME_TABLE = [
     -30,-40,-40,-50,-50,-40,-40,-30,  # Rank 8
 ]
 
-def count_bits(bb: int) -> int:
-    count = 0
-    while bb:
-        bb &= bb - 1  # Clear the least significant bit
-        count += 1
-    return count
+# Endgame tables. Pieces other than pawns and the king keep their middlegame
+# table, the king walks to the centre and pawns are worth more the further
+# they have run.
+PAWN_ENDGAME_TABLE = [
+     0,  0,  0,  0,  0,  0,  0,  0,   # Rank 1
+     0,  0,  0,  0,  0,  0,  0,  0,   # Rank 2
+     5,  5,  5,  5,  5,  5,  5,  5,   # Rank 3
+    10, 10, 10, 10, 10, 10, 10, 10,   # Rank 4
+    20, 20, 20, 20, 20, 20, 20, 20,   # Rank 5
+    35, 35, 35, 35, 35, 35, 35, 35,   # Rank 6
+    60, 60, 60, 60, 60, 60, 60, 60,   # Rank 7
+     0,  0,  0,  0,  0,  0,  0,  0,   # Rank 8
+]
+
+KING_ENDGAME_TABLE = [
+    -50,-30,-30,-30,-30,-30,-30,-50,  # Rank 1
+    -30,-30,  0,  0,  0,  0,-30,-30,  # Rank 2
+    -30,-10, 20, 30, 30, 20,-10,-30,  # Rank 3
+    -30,-10, 30, 40, 40, 30,-10,-30,  # Rank 4
+    -30,-10, 30, 40, 40, 30,-10,-30,  # Rank 5
+    -30,-10, 20, 30, 30, 20,-10,-30,  # Rank 6
+    -30,-20,-10,  0,  0,-10,-20,-30,  # Rank 7
+    -50,-40,-30,-20,-20,-30,-40,-50,  # Rank 8
+]
+
+MIDDLEGAME_TABLES = (PAWN_TABLE, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, KING_MIDDLEGAME_TABLE)
+ENDGAME_TABLES = (PAWN_ENDGAME_TABLE, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, KING_ENDGAME_TABLE)
+
+# Game phase from the non-pawn material left on the board. PHASE_MAX is the
+# starting position (4 minors, 4 rooks, 2 queens), 0 is kings and pawns only.
+# Promotions can push the count past PHASE_MAX, evaluate caps it.
+PHASE_WEIGHTS = [0, 1, 1, 2, 4, 0] * 2
+PHASE_MAX = 24
+
+# A middlegame and an endgame score packed into one int: mg in the low 16 bits
+# (signed), eg above them. Packed scores add and subtract like plain ints, so
+# make/unmake keep both halves up to date with a single addition.
+def pack_score(mg: int, eg: int) -> int:
+    return mg + (eg << 16)
+
+def mg_score(score: int) -> int:
+    return ((score + 0x8000) & 0xFFFF) - 0x8000
+
+def eg_score(score: int) -> int:
+    return (score - mg_score(score)) >> 16
+
+def taper(score: int, phase: int) -> int:
+    """Blend a packed score into centipawns, phase running from PHASE_MAX (middlegame) to 0 (endgame)."""
+    blended = mg_score(score) * phase + eg_score(score) * (PHASE_MAX - phase)
+    # Round toward zero so a position and its colour mirror get opposite scores
+    if blended < 0:
+        return -(-blended // PHASE_MAX)
+    return blended // PHASE_MAX
 
 def flip_square(sq: int) -> int:
     """Flip square vertically for black's perspective."""
@@ -100,41 +152,268 @@ def flip_square(sq: int) -> int:
     file = sq % 8
     return (7 - rank) * 8 + file
 
-def evaluate(pos: Position) -> int:
+# PST[piece_idx][sq] = packed middlegame/endgame material + piece-square
+# bonus for that piece on that square, from white's point of view (black
+# entries are negative and already flipped). Summed over the board this is the
+# whole material+PST score, which make_move/unmake_move keep up to date in pos.psqt.
+def _build_pst() -> list[list[int]]:
+    pst = []
+    for piece, idx in PIECE_TO_INDEX.items():
+        value = PIECE_VALUES[piece]
+        mg_table = MIDDLEGAME_TABLES[idx % 6]
+        eg_table = ENDGAME_TABLES[idx % 6]
+        if piece.isupper():
+            pst.append([pack_score(value + mg_table[sq], value + eg_table[sq]) for sq in range(64)])
+        else:
+            pst.append([-pack_score(value + mg_table[flip_square(sq)], value + eg_table[flip_square(sq)])
+                        for sq in range(64)])
+    return pst
+
+PST = _build_pst()
+
+
+def psqt_from_scratch(pos: Position) -> int:
+    """Packed material + PST score summed over the whole board. Used to set up pos.psqt."""
+    score = 0
+    for idx in range(12):
+        table = PST[idx]
+        for sq in squares(pos.pieces[idx]):
+            score += table[sq]
+    return score
+
+
+def phase_from_scratch(pos: Position) -> int:
+    """Game phase counted over the whole board. Used to set up pos.phase."""
+    return sum(PHASE_WEIGHTS[idx] * popcount(pos.pieces[idx]) for idx in range(12))
+
+
+# Pawn structure terms, packed mg/eg. Penalties are per pawn.
+DOUBLED_PAWN = pack_score(-10, -20)     # For each pawn beyond the first on a file
+ISOLATED_PAWN = pack_score(-10, -15)    # No friendly pawns on the adjacent files
+BACKWARD_PAWN = pack_score(-8, -10)     # Can't be supported and its stop square is covered by an enemy pawn
+
+# Passed pawn bonus by rank, counted from the pawn's own side
+PASSED_PAWN = [pack_score(mg, eg) for mg, eg in (
+    (0, 0), (5, 10), (10, 15), (15, 25), (25, 45), (40, 75), (60, 110), (0, 0),
+)]
+
+def _pawn_side_score(pawns: int, enemy_pawns: int, color: int) -> int:
+    """Packed pawn structure score for one side, positive is good for that side."""
+    score = 0
+
+    for file_mask in FILE_MASKS:
+        count = popcount(pawns & file_mask)
+        if count > 1:
+            score += DOUBLED_PAWN * (count - 1)
+
+    forward = FORWARD_RANKS[color]
+    passed_masks = PASSED_PAWN_MASKS[color]
+    # Read the other way round, PAWN_ATTACKS[color][stop] is where enemy pawns covering stop stand
+    enemy_attackers = PAWN_ATTACKS[color]
+    for sq in squares(pawns):
+        rank = sq // 8
+        neighbours = pawns & ADJACENT_FILE_MASKS[sq % 8]
+
+        if not neighbours:
+            score += ISOLATED_PAWN
+        else:
+            # Neighbours level with or behind the pawn could still come up and support it
+            stop = sq + 8 if color == 0 else sq - 8
+            if not neighbours & ~forward[rank] and enemy_attackers[stop] & enemy_pawns:
+                score += BACKWARD_PAWN
+
+        if not passed_masks[sq] & enemy_pawns:
+            score += PASSED_PAWN[rank if color == 0 else 7 - rank]
+
+    return score
+
+def pawn_structure(white_pawns: int, black_pawns: int) -> int:
+    """Packed pawn structure score from white's point of view."""
+    return _pawn_side_score(white_pawns, black_pawns, 0) - _pawn_side_score(black_pawns, white_pawns, 1)
+
+
+DEFAULT_PAWN_TABLE_SIZE = 1 << 14
+
+class ScoreCache:
+    """
+    Direct-mapped table of (key, score) entries. Each key has exactly one slot
+    and a new entry simply overwrites whatever was in it.
+    """
+
+    def __init__(self, size: int):
+        # A power of two, so the slot is key & mask instead of key % size
+        assert size > 0 and size & (size - 1) == 0, "cache size must be a power of two"
+        self.mask = size - 1
+        self.clear()
+
+    def clear(self) -> None:
+        self.table: list[tuple[int, int] | None] = [None] * (self.mask + 1)
+
+    def lookup(self, key: int) -> int | None:
+        entry = self.table[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        return None
+
+    def store(self, key: int, score: int) -> None:
+        self.table[key & self.mask] = (key, score)
+
+
+class PawnTable(ScoreCache):
+    """
+    Pawn structure scores keyed on pos.pawn_hash. Pawn structure rarely
+    changes inside a search, so almost every probe hits.
+    """
+
+    def __init__(self, size: int = DEFAULT_PAWN_TABLE_SIZE):
+        super().__init__(size)
+
+    def probe(self, pos: Position) -> int:
+        """Packed pawn structure score for pos, computed and stored on a miss."""
+        key = pos.pawn_hash
+        score = self.lookup(key)
+        if score is None:
+            score = pawn_structure(pos.pieces[0], pos.pieces[6])
+            self.store(key, score)
+        return score
+
+pawn_table = PawnTable()
+
+
+# Mobility bonus per square a piece can reach, by piece type (packed mg/eg).
+# Squares held by our own pieces or covered by enemy pawns don't count.
+MOBILITY_WEIGHTS = [0, pack_score(4, 4), pack_score(3, 4), pack_score(2, 4), pack_score(1, 2), 0]
+
+# King safety: attack units each piece type brings when it hits the enemy king
+# ring. With two or more attackers the attacking side gets units^2 * 2 in the
+# middlegame, capped at KING_DANGER_MAX. A single attacker is no real threat.
+KING_ATTACK_UNITS = [0, 2, 2, 3, 5, 0]
+KING_DANGER_MAX = 250
+
+# Mobility and king safety together rarely move the score by more than this.
+# If material, PST and pawns alone are further than that outside the search
+# window, evaluate skips them (lazy evaluation).
+LAZY_MARGIN = 300
+
+def _piece_activity(pos: Position, color: int) -> int:
+    """Packed mobility and king attack score for one side's knights, bishops, rooks and queens."""
+    pieces = pos.pieces
+    occ = pos.all_occ
+    if color == WHITE:
+        base = 0
+        own = pos.white_occ
+        enemy_pawns = pieces[6]
+        enemy_pawn_attacks = ((enemy_pawns & NOT_FILE_A) >> 9) | ((enemy_pawns & NOT_FILE_H) >> 7)
+        enemy_king = pieces[11]
+    else:
+        base = 6
+        own = pos.black_occ
+        enemy_pawns = pieces[0]
+        enemy_pawn_attacks = (((enemy_pawns & NOT_FILE_A) << 7) | ((enemy_pawns & NOT_FILE_H) << 9)) & MASK64
+        enemy_king = pieces[5]
+
+    area = ~(own | enemy_pawn_attacks) & MASK64
+    king_ring = KING_ATTACKS[msb(enemy_king)] if enemy_king else 0
+
+    score = 0
+    attackers = 0
+    units = 0
+    for piece in range(1, 5):
+        weight = MOBILITY_WEIGHTS[piece]
+        for sq in squares(pieces[base + piece]):
+            if piece == 1:
+                attacks = KNIGHT_ATTACKS[sq]
+            elif piece == 2:
+                attacks = bishop_attacks(sq, occ)
+            elif piece == 3:
+                attacks = rook_attacks(sq, occ)
+            else:
+                attacks = bishop_attacks(sq, occ) | rook_attacks(sq, occ)
+            score += weight * popcount(attacks & area)
+            if attacks & king_ring:
+                attackers += 1
+                units += KING_ATTACK_UNITS[piece]
+
+    if attackers >= 2:
+        score += pack_score(min(units * units * 2, KING_DANGER_MAX), 0)
+    return score
+
+
+def _evaluate(pos: Position, alpha: int | None, beta: int | None) -> tuple[int, bool]:
+    """evaluate, plus whether the score is the full one (False after a lazy cutoff)."""
+    # Material and piece-square scores and the phase are kept incrementally
+    # by make/unmake, pawn structure comes from the pawn hash table
+    score = pos.psqt + pawn_table.probe(pos)
+    phase = min(pos.phase, PHASE_MAX)
+
+    if alpha is not None:
+        lazy = taper(score, phase)
+        if lazy + LAZY_MARGIN <= alpha or lazy - LAZY_MARGIN >= beta:
+            return lazy, False
+
+    score += _piece_activity(pos, WHITE) - _piece_activity(pos, BLACK)
+    return taper(score, phase), True
+
+
+def evaluate(pos: Position, alpha: int | None = None, beta: int | None = None) -> int:
     """
     Evaluate the position from white's perspective.
     Positive = white is better, negative = black is better.
     Returns score in centipawns.
+
+    alpha and beta are an optional search window, also from white's
+    perspective. Mobility and king safety are skipped when the rest of the
+    score is more than LAZY_MARGIN outside it.
     """
-    score = 0
-    
-    # For each piece type, count material and add positional bonus
-    for piece, value in PIECE_VALUES.items():
-        idx = PIECE_TO_INDEX[piece]
-        bb = pos.pieces[idx]
-        
-        # Get the appropriate table
-        if piece.lower() == 'p':
-            table = PAWN_TABLE
-        elif piece.lower() == 'n':
-            table = KNIGHT_TABLE
-        elif piece.lower() == 'b':
-            table = BISHOP_TABLE
-        elif piece.lower() == 'r':
-            table = ROOK_TABLE
-        elif piece.lower() == 'q':
-            table = QUEEN_TABLE
-        elif piece.lower() == 'k':
-            table = KING_MIDDLEGAME_TABLE
-        
-        # Loop through each piece of this type
-        while bb:
-            sq = (bb & -bb).bit_length() - 1  # Get LSB square
-            bb &= bb - 1  # Clear LSB
-            
-            if piece.isupper():  # White
-                score += value + table[sq]
-            else:  # Black
-                score -= value + table[flip_square(sq)]
-    
-    return score
\ No newline at end of file
+    return _evaluate(pos, alpha, beta)[0]
+
+
+DEFAULT_EVAL_CACHE_SIZE = 1 << 16
+
+class EvalCache(ScoreCache):
+    """
+    Full static evaluations keyed on pos.hash, scores from the side to move's
+    point of view. hits and misses are kept for UCI info output.
+    """
+
+    def __init__(self, size: int = DEFAULT_EVAL_CACHE_SIZE):
+        super().__init__(size)
+
+    def clear(self) -> None:
+        super().clear()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, key: int) -> int | None:
+        score = self.lookup(key)
+        if score is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return score
+
+eval_cache = EvalCache()
+
+
+def evaluate_relative(pos: Position, alpha: int, beta: int) -> int:
+    """
+    Static score from the side to move's point of view, for the search.
+    Looked up in eval_cache first. Scores cut short by the lazy margin depend
+    on the window, so only full evaluations are stored.
+    """
+    key = pos.hash
+    score = eval_cache.probe(key)
+    if score is not None:
+        return score
+
+    if pos.stm == WHITE:
+        score, full = _evaluate(pos, alpha, beta)
+    else:
+        score, full = _evaluate(pos, -beta, -alpha)
+        score = -score
+    if full:
+        eval_cache.store(key, score)
+    return score
@@ -1,5 +1,7 @@
 from .bitboard import square_index, set_bit
-from .position import Position, PIECE_TO_INDEX
+from .position import Position, PIECE_TO_INDEX, PIECE_ORDER, WHITE, BLACK, castling_from_str, castling_to_str
+from .zobrist import hash_position, hash_pawns
+from .evaluation import psqt_from_scratch, phase_from_scratch
 
 # Example fen: rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1
 
@@ -34,6 +36,7 @@ def parse_fen(fen: str) -> Position:
                 sq = square_index(file, rank)
                 idx = PIECE_TO_INDEX[ch]
                 pos.pieces[idx] = set_bit(pos.pieces[idx], sq)
+                pos.board[sq] = idx
                 file += 1
         
         if file != 8:
@@ -42,8 +45,8 @@ def parse_fen(fen: str) -> Position:
     if stm not in ("w", "b"):
         raise ValueError("Side to move must be w or b")
 
-    pos.side_to_move = stm
-    pos.castling = castling
+    pos.stm = WHITE if stm == "w" else BLACK
+    pos.castling_rights = castling_from_str(castling)
 
     if ep == "-":
         pos.ep_square = None
@@ -56,4 +59,34 @@ def parse_fen(fen: str) -> Position:
     pos.fullmove_number = int(fullmove)
 
     pos.recompute_occupancy()
-    return pos        
\ No newline at end of file
+    pos.hash = hash_position(pos)
+    pos.pawn_hash = hash_pawns(pos)
+    pos.psqt = psqt_from_scratch(pos)
+    pos.phase = phase_from_scratch(pos)
+    return pos
+
+
+def to_fen(pos: Position) -> str:
+    ranks = []
+    for rank in range(7, -1, -1):
+        rank_str = ""
+        empty = 0
+        for file in range(8):
+            idx = pos.board[square_index(file, rank)]
+            if idx is None:
+                empty += 1
+                continue
+            if empty:
+                rank_str += str(empty)
+                empty = 0
+            rank_str += PIECE_ORDER[idx]
+        if empty:
+            rank_str += str(empty)
+        ranks.append(rank_str)
+
+    stm = "w" if pos.stm == WHITE else "b"
+    ep = "-" if pos.ep_square is None else FILES[pos.ep_square % 8] + str(pos.ep_square // 8 + 1)
+    return " ".join((
+        "/".join(ranks), stm, castling_to_str(pos.castling_rights), ep,
+        str(pos.halfmove_clock), str(pos.fullmove_number),
+    ))
@@ -1,129 +1,290 @@
-from .position import Position, PIECE_TO_INDEX
-from .bitboard import set_bit, clear_bit, is_set
-from .move import Move
+from .position import Position, WHITE, CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ
+from .move import TO_SHIFT, PROMO_SHIFT, FLAG_EP, FLAG_CASTLE, FLAG_DOUBLE_PUSH, NO_MOVE, move_to_uci
+from .zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EP_KEYS, hash_position, hash_pawns
+from .evaluation import PST, PHASE_WEIGHTS, psqt_from_scratch, phase_from_scratch
 
-def make_move(pos: Position, move: Move) -> Position:
-    new_pos = pos.copy()
+# When True, every make_move checks the incremental hashes, psqt and phase against a full recompute.
+# Slow, only meant for tests and debugging.
+DEBUG_HASH = False
 
-    my_pieces = range(0, 6) if pos.side_to_move == "w" else range(6, 12)
-    enemy_pieces = range(6, 12) if pos.side_to_move == "w" else range(0, 6)
+# make_move updates the position in place and pushes an undo record onto
+# pos.undo_stack. unmake_move pops it and restores the previous position.
+#
+# Undo record layout:
+#   (move, moving_piece_idx, captured_piece_idx, castling, ep_square, halfmove_clock, hash, pawn_hash, psqt, phase)
+# move is the packed int from move.py. captured_piece_idx is None for quiet
+# moves and en passant. The last seven are the values from *before* the move was made,
+# castling being the rights mask.
 
-    # Find which piece is moving
-    moving_piece_idx = None
-    for i in my_pieces:
-        if is_set(new_pos.pieces[i], move.from_sq):
-            moving_piece_idx = i
-            break
+# CASTLING_MASK[sq] = rights that survive a move from or to sq. Moving the king
+# or a rook, or capturing a rook, clears the matching bits.
+CASTLING_MASK = [CASTLE_WK | CASTLE_WQ | CASTLE_BK | CASTLE_BQ] * 64
+CASTLING_MASK[0] &= ~CASTLE_WQ                 # a1
+CASTLING_MASK[4] &= ~(CASTLE_WK | CASTLE_WQ)   # e1
+CASTLING_MASK[7] &= ~CASTLE_WK                 # h1
+CASTLING_MASK[56] &= ~CASTLE_BQ                # a8
+CASTLING_MASK[60] &= ~(CASTLE_BK | CASTLE_BQ)  # e8
+CASTLING_MASK[63] &= ~CASTLE_BK                # h8
+
+def make_move(pos: Position, move: int) -> None:
+    pieces = pos.pieces
+    board = pos.board
+    from_sq = move & 63
+    to_sq = (move >> TO_SHIFT) & 63
+    from_bb = 1 << from_sq
+    to_bb = 1 << to_sq
+    white = pos.stm == WHITE
+    h = pos.hash
+    pawn_hash = pos.pawn_hash
+    pawn_idx = 0 if white else 6
+
+    # Moving and captured piece straight from the mailbox.
+    # En passant leaves to_sq empty and is handled separately below.
+    moving_piece_idx = board[from_sq]
+    captured_idx = board[to_sq]
+
+    # Save what we need to undo the move before changing anything
+    if pos.undo_ply == len(pos.undo_stack):
+        pos.undo_stack.extend([None] * len(pos.undo_stack))
+    pos.undo_stack[pos.undo_ply] = (
+        move, moving_piece_idx, captured_idx,
+        pos.castling_rights, pos.ep_square, pos.halfmove_clock, h, pawn_hash, pos.psqt, pos.phase,
+    )
+    pos.undo_ply += 1
+
+    # Occupancy changes are collected here and applied at the end
+    my_change = from_bb | to_bb
+    enemy_change = 0
 
     # Move our piece
-    new_pos.pieces[moving_piece_idx] = clear_bit(new_pos.pieces[moving_piece_idx], move.from_sq)
-    new_pos.pieces[moving_piece_idx] = set_bit(new_pos.pieces[moving_piece_idx], move.to_sq)
+    pieces[moving_piece_idx] ^= from_bb | to_bb
+    board[from_sq] = None
+    board[to_sq] = moving_piece_idx
+    h ^= PIECE_KEYS[moving_piece_idx][from_sq] ^ PIECE_KEYS[moving_piece_idx][to_sq]
+    moving_pst = PST[moving_piece_idx]
+    psqt = pos.psqt + moving_pst[to_sq] - moving_pst[from_sq]
+    if moving_piece_idx == pawn_idx:
+        pawn_hash ^= PIECE_KEYS[pawn_idx][from_sq] ^ PIECE_KEYS[pawn_idx][to_sq]
 
     # Remove captured piece (if any)
-    for i in enemy_pieces:
-        if is_set(new_pos.pieces[i], move.to_sq):
-            new_pos.pieces[i] = clear_bit(new_pos.pieces[i], move.to_sq)
-            break
+    if captured_idx is not None:
+        pieces[captured_idx] ^= to_bb
+        h ^= PIECE_KEYS[captured_idx][to_sq]
+        psqt -= PST[captured_idx][to_sq]
+        pos.phase -= PHASE_WEIGHTS[captured_idx]
+        if captured_idx % 6 == 0:
+            pawn_hash ^= PIECE_KEYS[captured_idx][to_sq]
+        enemy_change |= to_bb
 
     # --- Promotions ---
-    if move.promo:
+    promo = (move >> PROMO_SHIFT) & 7
+    if promo:
         # Remove the pawn we just placed on to_sq
-        new_pos.pieces[moving_piece_idx] = clear_bit(new_pos.pieces[moving_piece_idx], move.to_sq)
-        # Add the promoted piece
-        promo_char = move.promo.upper() if pos.side_to_move == "w" else move.promo.lower()
-        promo_idx = PIECE_TO_INDEX[promo_char]
-        new_pos.pieces[promo_idx] = set_bit(new_pos.pieces[promo_idx], move.to_sq)
+        pieces[moving_piece_idx] ^= to_bb
+        # Add the promoted piece (promo type is the white piece index)
+        promo_idx = promo if white else promo + 6
+        pieces[promo_idx] |= to_bb
+        board[to_sq] = promo_idx
+        h ^= PIECE_KEYS[moving_piece_idx][to_sq] ^ PIECE_KEYS[promo_idx][to_sq]
+        pawn_hash ^= PIECE_KEYS[moving_piece_idx][to_sq]
+        psqt += PST[promo_idx][to_sq] - moving_pst[to_sq]
+        pos.phase += PHASE_WEIGHTS[promo_idx]
+
+    old_ep = pos.ep_square
 
     # --- En passant capture ---
-    # If a pawn moves to the ep_square, remove the captured pawn
-    if pos.ep_square is not None and move.to_sq == pos.ep_square:
-        # Check if it's a pawn moving (idx 0 for white P, idx 6 for black p)
-        pawn_idx = 0 if pos.side_to_move == "w" else 6
-        if moving_piece_idx == pawn_idx:
-            # The captured pawn is one rank behind the ep_square
-            if pos.side_to_move == "w":
-                captured_sq = pos.ep_square - 8  # Black pawn is below ep square
-                new_pos.pieces[6] = clear_bit(new_pos.pieces[6], captured_sq)  # Remove black pawn
-            else:
-                captured_sq = pos.ep_square + 8  # White pawn is above ep square
-                new_pos.pieces[0] = clear_bit(new_pos.pieces[0], captured_sq)  # Remove white pawn
+    # Remove the pawn captured en passant
+    if move & FLAG_EP:
+        # The captured pawn is one rank behind the ep_square
+        if white:
+            captured_sq = old_ep - 8  # Black pawn is below ep square
+            pieces[6] ^= 1 << captured_sq
+            h ^= PIECE_KEYS[6][captured_sq]
+            pawn_hash ^= PIECE_KEYS[6][captured_sq]
+            psqt -= PST[6][captured_sq]
+        else:
+            captured_sq = old_ep + 8  # White pawn is above ep square
+            pieces[0] ^= 1 << captured_sq
+            h ^= PIECE_KEYS[0][captured_sq]
+            pawn_hash ^= PIECE_KEYS[0][captured_sq]
+            psqt -= PST[0][captured_sq]
+        board[captured_sq] = None
+        enemy_change |= 1 << captured_sq
 
     # --- Update en passant square ---
     # Set ep_square if a pawn moved two squares
-    pawn_idx = 0 if pos.side_to_move == "w" else 6
-    if moving_piece_idx == pawn_idx:
-        if pos.side_to_move == "w" and move.to_sq - move.from_sq == 16:
-            new_pos.ep_square = move.from_sq + 8
-        elif pos.side_to_move == "b" and move.from_sq - move.to_sq == 16:
-            new_pos.ep_square = move.from_sq - 8
-        else:
-            new_pos.ep_square = None
-    else:
-        new_pos.ep_square = None
+    new_ep = None
+    if move & FLAG_DOUBLE_PUSH:
+        new_ep = from_sq + 8 if white else from_sq - 8
+    pos.ep_square = new_ep
+
+    if old_ep != new_ep:
+        h ^= EP_KEYS[old_ep % 8 if old_ep is not None else 8]
+        h ^= EP_KEYS[new_ep % 8 if new_ep is not None else 8]
 
     # --- Castling ---
-    king_idx = 5 if pos.side_to_move == "w" else 11
-    if moving_piece_idx == king_idx:
-        # Kingside castling
-        if move.to_sq - move.from_sq == 2:
-            rook_idx = 3 if pos.side_to_move == "w" else 9
-            rook_from = move.from_sq + 3  # h1 or h8
-            rook_to = move.from_sq + 1    # f1 or f8
-            new_pos.pieces[rook_idx] = clear_bit(new_pos.pieces[rook_idx], rook_from)
-            new_pos.pieces[rook_idx] = set_bit(new_pos.pieces[rook_idx], rook_to)
-        # Queenside castling
-        elif move.from_sq - move.to_sq == 2:
-            rook_idx = 3 if pos.side_to_move == "w" else 9
-            rook_from = move.from_sq - 4  # a1 or a8
-            rook_to = move.from_sq - 1    # d1 or d8
-            new_pos.pieces[rook_idx] = clear_bit(new_pos.pieces[rook_idx], rook_from)
-            new_pos.pieces[rook_idx] = set_bit(new_pos.pieces[rook_idx], rook_to)
+    if move & FLAG_CASTLE:
+        rook_idx = 3 if white else 9
+        if to_sq > from_sq:
+            rook_from = from_sq + 3  # h1 or h8
+            rook_to = from_sq + 1    # f1 or f8
+        else:
+            rook_from = from_sq - 4  # a1 or a8
+            rook_to = from_sq - 1    # d1 or d8
+        rook_bb = (1 << rook_from) | (1 << rook_to)
+        pieces[rook_idx] ^= rook_bb
+        board[rook_from] = None
+        board[rook_to] = rook_idx
+        h ^= PIECE_KEYS[rook_idx][rook_from] ^ PIECE_KEYS[rook_idx][rook_to]
+        psqt += PST[rook_idx][rook_to] - PST[rook_idx][rook_from]
+        my_change ^= rook_bb
 
     # --- Update castling rights ---
-    # Remove rights if king or rook moves
-    new_castling = new_pos.castling
-    if pos.side_to_move == "w":
-        if moving_piece_idx == 5:  # King moved
-            new_castling = new_castling.replace("K", "").replace("Q", "")
-        if move.from_sq == 0:  # a1 rook
-            new_castling = new_castling.replace("Q", "")
-        if move.from_sq == 7:  # h1 rook
-            new_castling = new_castling.replace("K", "")
-    else:
-        if moving_piece_idx == 11:  # King moved
-            new_castling = new_castling.replace("k", "").replace("q", "")
-        if move.from_sq == 56:  # a8 rook
-            new_castling = new_castling.replace("q", "")
-        if move.from_sq == 63:  # h8 rook
-            new_castling = new_castling.replace("k", "")
-    # Also remove rights if rook is captured
-    if move.to_sq == 0:
-        new_castling = new_castling.replace("Q", "")
-    if move.to_sq == 7:
-        new_castling = new_castling.replace("K", "")
-    if move.to_sq == 56:
-        new_castling = new_castling.replace("q", "")
-    if move.to_sq == 63:
-        new_castling = new_castling.replace("k", "")
-    new_pos.castling = new_castling if new_castling else "-"
+    old_castling = pos.castling_rights
+    new_castling = old_castling & CASTLING_MASK[from_sq] & CASTLING_MASK[to_sq]
+    if new_castling != old_castling:
+        pos.castling_rights = new_castling
+        h ^= CASTLING_KEYS[old_castling] ^ CASTLING_KEYS[new_castling]
 
     # --- Update clocks ---
     # Halfmove clock resets on pawn move or capture
-    is_capture = any(is_set(pos.pieces[i], move.to_sq) for i in enemy_pieces)
-    is_pawn_move = moving_piece_idx == 0 or moving_piece_idx == 6
-    if is_pawn_move or is_capture:
-        new_pos.halfmove_clock = 0
+    if moving_piece_idx == pawn_idx or captured_idx is not None:
+        pos.halfmove_clock = 0
     else:
-        new_pos.halfmove_clock += 1
+        pos.halfmove_clock += 1
 
     # Fullmove number increments after black moves
-    if pos.side_to_move == "b":
-        new_pos.fullmove_number += 1
+    if not white:
+        pos.fullmove_number += 1
 
     # Switch side to move
-    new_pos.side_to_move = "b" if pos.side_to_move == "w" else "w"
+    pos.stm ^= 1
+    h ^= SIDE_KEY
+    pos.hash = h
+    pos.pawn_hash = pawn_hash
+    pos.psqt = psqt
+
+    # Update occupancy bitboards
+    if white:
+        pos.white_occ ^= my_change
+        pos.black_occ ^= enemy_change
+    else:
+        pos.black_occ ^= my_change
+        pos.white_occ ^= enemy_change
+    pos.all_occ = pos.white_occ | pos.black_occ
+
+    if DEBUG_HASH:
+        assert pos.hash == hash_position(pos), f"Incremental hash mismatch after {move_to_uci(move)}"
+        assert pos.pawn_hash == hash_pawns(pos), f"Incremental pawn hash mismatch after {move_to_uci(move)}"
+        assert pos.psqt == psqt_from_scratch(pos), f"Incremental psqt mismatch after {move_to_uci(move)}"
+        assert pos.phase == phase_from_scratch(pos), f"Incremental phase mismatch after {move_to_uci(move)}"
+
+
+def unmake_move(pos: Position) -> None:
+    """Take back the last move made with make_move."""
+    pos.undo_ply -= 1
+    move, moving_piece_idx, captured_idx, castling, ep_square, halfmove_clock, h, pawn_hash, psqt, phase = pos.undo_stack[pos.undo_ply]
+
+    pieces = pos.pieces
+    board = pos.board
+    from_sq = move & 63
+    to_sq = (move >> TO_SHIFT) & 63
+    from_bb = 1 << from_sq
+    to_bb = 1 << to_sq
+
+    # Side that made the move
+    pos.stm ^= 1
+    white = pos.stm == WHITE
+    if not white:
+        pos.fullmove_number -= 1
+
+    my_change = from_bb | to_bb
+    enemy_change = 0
+
+    # Take our piece back (a promoted piece turns back into the pawn)
+    promo = (move >> PROMO_SHIFT) & 7
+    if promo:
+        pieces[promo if white else promo + 6] ^= to_bb
+        pieces[moving_piece_idx] |= from_bb
+    else:
+        pieces[moving_piece_idx] ^= from_bb | to_bb
+
+    board[from_sq] = moving_piece_idx
+    board[to_sq] = captured_idx
+
+    # Put back the captured piece
+    if captured_idx is not None:
+        pieces[captured_idx] |= to_bb
+        enemy_change |= to_bb
+
+    # Put back a pawn taken en passant
+    if move & FLAG_EP:
+        if white:
+            captured_sq = ep_square - 8
+            pieces[6] |= 1 << captured_sq
+        else:
+            captured_sq = ep_square + 8
+            pieces[0] |= 1 << captured_sq
+        board[captured_sq] = 6 if white else 0
+        enemy_change |= 1 << captured_sq
+
+    # Move the rook back if this was castling
+    if move & FLAG_CASTLE:
+        rook_idx = 3 if white else 9
+        if to_sq > from_sq:
+            rook_from, rook_to = from_sq + 3, from_sq + 1
+        else:
+            rook_from, rook_to = from_sq - 4, from_sq - 1
+        rook_bb = (1 << rook_from) | (1 << rook_to)
+        pieces[rook_idx] ^= rook_bb
+        board[rook_to] = None
+        board[rook_from] = rook_idx
+        my_change ^= rook_bb
+
+    pos.castling_rights = castling
+    pos.ep_square = ep_square
+    pos.halfmove_clock = halfmove_clock
+    pos.hash = h
+    pos.pawn_hash = pawn_hash
+    pos.psqt = psqt
+    pos.phase = phase
+
+    if white:
+        pos.white_occ ^= my_change
+        pos.black_occ ^= enemy_change
+    else:
+        pos.black_occ ^= my_change
+        pos.white_occ ^= enemy_change
+    pos.all_occ = pos.white_occ | pos.black_occ
+
+
+def make_null_move(pos: Position) -> None:
+    """
+    Pass the turn without moving, for null move pruning. Only the side to
+    move, en passant square, halfmove clock and hash change. Undo with
+    unmake_null_move. The undo record has NO_MOVE as its move.
+    """
+    if pos.undo_ply == len(pos.undo_stack):
+        pos.undo_stack.extend([None] * len(pos.undo_stack))
+    pos.undo_stack[pos.undo_ply] = (
+        NO_MOVE, None, None,
+        pos.castling_rights, pos.ep_square, pos.halfmove_clock, pos.hash, pos.pawn_hash, pos.psqt, pos.phase,
+    )
+    pos.undo_ply += 1
+
+    h = pos.hash ^ SIDE_KEY
+    if pos.ep_square is not None:
+        h ^= EP_KEYS[pos.ep_square % 8] ^ EP_KEYS[8]
+        pos.ep_square = None
+    pos.hash = h
+    pos.halfmove_clock += 1
+    pos.stm ^= 1
 
-    # Recompute occupancy bitboards
-    new_pos.recompute_occupancy()
 
-    return new_pos
\ No newline at end of file
+def unmake_null_move(pos: Position) -> None:
+    pos.undo_ply -= 1
+    _, _, _, _, ep_square, halfmove_clock, h, _, _, _ = pos.undo_stack[pos.undo_ply]
+    pos.stm ^= 1
+    pos.ep_square = ep_square
+    pos.halfmove_clock = halfmove_clock
+    pos.hash = h
@@ -1,8 +1,58 @@
 from dataclasses import dataclass
 from .bitboard import sq_to_uci
 
+# Internally moves are packed into a single int so generating and comparing
+# them never allocates an object:
+#
+#   bits  0-5   from square
+#   bits  6-11  to square
+#   bits 12-14  promotion piece type (0 = none, 1 = N, 2 = B, 3 = R, 4 = Q)
+#   bits 15-18  flags
+#
+# The promotion type matches the white piece index in PIECE_ORDER ("PNBRQK"),
+# add 6 for the black piece index.
+
+TO_SHIFT = 6
+PROMO_SHIFT = 12
+
+FLAG_CAPTURE = 1 << 15
+FLAG_EP = 1 << 16           # En passant capture (also has FLAG_CAPTURE set)
+FLAG_CASTLE = 1 << 17
+FLAG_DOUBLE_PUSH = 1 << 18
+
+PROMO_MASK = 7 << PROMO_SHIFT
+
+PROMO_NONE = 0
+PROMO_KNIGHT = 1
+PROMO_BISHOP = 2
+PROMO_ROOK = 3
+PROMO_QUEEN = 4
+
+PROMO_CHARS = ("", "n", "b", "r", "q")
+CHAR_TO_PROMO = {"n": PROMO_KNIGHT, "b": PROMO_BISHOP, "r": PROMO_ROOK, "q": PROMO_QUEEN}
+
+# a1a1 can never be a real move, so 0 means "no move"
+NO_MOVE = 0
+
+def encode_move(from_sq: int, to_sq: int, promo: int = PROMO_NONE, flags: int = 0) -> int:
+    return from_sq | (to_sq << TO_SHIFT) | (promo << PROMO_SHIFT) | flags
+
+def move_from(move: int) -> int:
+    return move & 63
+
+def move_to(move: int) -> int:
+    return (move >> TO_SHIFT) & 63
+
+def move_promo(move: int) -> int:
+    return (move >> PROMO_SHIFT) & 7
+
+def move_to_uci(move: int) -> str:
+    return f"{sq_to_uci(move & 63)}{sq_to_uci((move >> TO_SHIFT) & 63)}{PROMO_CHARS[(move >> PROMO_SHIFT) & 7]}"
+
+
 @dataclass(frozen=True, slots=True)
 class Move:
+    """Public, readable view of a packed move. Not used inside search or movegen."""
     from_sq: int
     to_sq: int
     promo: str | None = None
@@ -10,4 +60,9 @@ class Move:
     def to_uci(self) -> str:
         if self.promo:
             return f"{sq_to_uci(self.from_sq)}{sq_to_uci(self.to_sq)}{self.promo}"
-        return f"{sq_to_uci(self.from_sq)}{sq_to_uci(self.to_sq)}"
\ No newline at end of file
+        return f"{sq_to_uci(self.from_sq)}{sq_to_uci(self.to_sq)}"
+
+    @staticmethod
+    def from_int(move: int) -> "Move":
+        promo = move_promo(move)
+        return Move(move_from(move), move_to(move), PROMO_CHARS[promo] if promo else None)
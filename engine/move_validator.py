@@ -1,17 +1,17 @@
-from .makeunmake import make_move
-from .move import Move
-from .position import Position, PIECE_TO_INDEX
-from .bitboard import pop_lsb
+from .makeunmake import make_move, unmake_move
+from .position import Position, PIECE_TO_INDEX, WHITE
+from .bitboard import msb
 from .detect_attack import is_square_attacked
 
-def is_legal(pos: Position, move: Move):
-    new_pos = make_move(pos, move)
+def is_legal(pos: Position, move: int):
+    white = pos.stm == WHITE
+    make_move(pos, move)
 
-    my_king_bb = new_pos.pieces[PIECE_TO_INDEX["K"]] if pos.side_to_move == "w" else new_pos.pieces[PIECE_TO_INDEX["k"]]
-    my_king_sq, _  = pop_lsb(my_king_bb)
+    my_king_bb = pos.pieces[PIECE_TO_INDEX["K"]] if white else pos.pieces[PIECE_TO_INDEX["k"]]
+    my_king_sq = msb(my_king_bb)
 
-    attacking_side = "w" if pos.side_to_move == "b" else "b"
-    if is_square_attacked(new_pos, my_king_sq, attacking_side):
-        return False
-    
-    return True
+    attacking_side = "b" if white else "w"
+    in_check = is_square_attacked(pos, my_king_sq, attacking_side)
+
+    unmake_move(pos)
+    return not in_check
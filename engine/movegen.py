@@ -1,13 +1,18 @@
-from engine.sliders import bishop_attacks, queen_attacks, rook_attacks
-from .position import Position, PIECE_TO_INDEX
-from .attacks import KNIGHT_ATTACKS, KING_ATTACKS, FILE_A, FILE_H, RANK_2, RANK_7, RANK_1, RANK_8
-from .bitboard import pop_lsb
-from .move import Move
+from engine.sliders import bishop_attacks, queen_attacks, rook_attacks, BETWEEN
+from .position import Position, PIECE_TO_INDEX, WHITE, CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ
+from .attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, FILE_A, FILE_H, RANK_1, RANK_3, RANK_6, RANK_8
+from .bitboard import SQUARE_BB, msb, squares
+from .move import (
+    TO_SHIFT, PROMO_SHIFT, FLAG_CAPTURE, FLAG_EP, FLAG_CASTLE, FLAG_DOUBLE_PUSH,
+    PROMO_MASK, PROMO_QUEEN, PROMO_ROOK, PROMO_BISHOP, PROMO_KNIGHT, NO_MOVE, move_to_uci,
+)
 from .detect_attack import is_square_attacked
-from .move_validator import is_legal
 
 MASK64 = 0xFFFFFFFFFFFFFFFF
-PROMOS = ("q", "r", "b", "n")
+
+# Promotion bits already shifted into place
+QUEEN_PROMO = PROMO_QUEEN << PROMO_SHIFT
+UNDER_PROMOS = tuple(p << PROMO_SHIFT for p in (PROMO_ROOK, PROMO_BISHOP, PROMO_KNIGHT))
 
 # Square indices for castling
 E1, F1, G1, H1 = 4, 5, 6, 7
@@ -15,10 +20,23 @@ A1, B1, C1, D1 = 0, 1, 2, 3
 E8, F8, G8, H8 = 60, 61, 62, 63
 A8, B8, C8, D8 = 56, 57, 58, 59
 
-def generate_knight_moves(pos: Position) -> list[Move]:
-    moves: list[Move] = []
+# Moves are packed ints, see move.py. Inside the generators they are built inline
+# as from_sq | (to_sq << TO_SHIFT) | flags to avoid a function call per move.
+
+def _add_piece_moves(moves: list[int], from_sq: int, targets: int, enemy_occ: int) -> None:
+    """Append moves from from_sq to every target square, flagging captures."""
+    t = targets & enemy_occ
+    for to_sq in squares(t):
+        moves.append(from_sq | (to_sq << TO_SHIFT) | FLAG_CAPTURE)
+
+    t = targets & ~enemy_occ
+    for to_sq in squares(t):
+        moves.append(from_sq | (to_sq << TO_SHIFT))
 
-    if pos.side_to_move == "w":
+def generate_knight_moves(pos: Position) -> list[int]:
+    moves: list[int] = []
+
+    if pos.stm == WHITE:
         knights = pos.pieces[PIECE_TO_INDEX["N"]]
         own_occ = pos.white_occ
         enemy_occ = pos.black_occ
@@ -28,329 +46,232 @@ def generate_knight_moves(pos: Position) -> list[Move]:
         enemy_occ = pos.white_occ
 
     bb = knights
-    while bb:
-        from_sq, bb = pop_lsb(bb)
-        
+    for from_sq in squares(bb):
         attacks = KNIGHT_ATTACKS[from_sq]
-        
         targets = attacks & ~own_occ
-
-        t = targets
-        while t:
-            to_sq, t = pop_lsb(t)
-            moves.append(Move(from_sq, to_sq))
+        _add_piece_moves(moves, from_sq, targets, enemy_occ)
 
     return moves
 
-def generate_king_moves(pos: Position) -> list[Move]:
-    moves: list[Move] = []
+def generate_king_moves(pos: Position) -> list[int]:
+    moves: list[int] = []
 
-    if pos.side_to_move == "w":
+    if pos.stm == WHITE:
         king_bb = pos.pieces[PIECE_TO_INDEX["K"]]
         own_occ = pos.white_occ
+        enemy_occ = pos.black_occ
     else:
         king_bb = pos.pieces[PIECE_TO_INDEX["k"]]
         own_occ = pos.black_occ
-    
+        enemy_occ = pos.white_occ
+
     if king_bb == 0:
         return moves
-    
-    from_sq, _ = pop_lsb(king_bb)
+
+    from_sq = msb(king_bb)
     targets = KING_ATTACKS[from_sq] & ~own_occ
+    _add_piece_moves(moves, from_sq, targets, enemy_occ)
 
-    t = targets
-    while t:
-        to_sq, t = pop_lsb(t)
-        moves.append(Move(from_sq, to_sq))
+    _add_castling_moves(moves, pos)
+    return moves
 
-    # Castling
-    if pos.side_to_move == "w":
+def _add_castling_moves(moves: list[int], pos: Position) -> None:
+    if pos.stm == WHITE:
         # Kingside
-        if "K" in pos.castling:
+        if pos.castling_rights & CASTLE_WK:
             if not (pos.all_occ & ((1 << F1) | (1 << G1))):
                 # Check king is not in check and doesn't pass through check
                 if (not is_square_attacked(pos, E1, "b") and
                     not is_square_attacked(pos, F1, "b") and
                     not is_square_attacked(pos, G1, "b")):
-                    moves.append(Move(E1, G1))
-        
-        if "Q" in pos.castling:
+                    moves.append(E1 | (G1 << TO_SHIFT) | FLAG_CASTLE)
+
+        if pos.castling_rights & CASTLE_WQ:
             if not (pos.all_occ & ((1 << B1) | (1 << C1) | (1 << D1))):
                  if (not is_square_attacked(pos, E1, "b") and
                     not is_square_attacked(pos, D1, "b") and
                     not is_square_attacked(pos, C1, "b")):
-                    moves.append(Move(E1, C1))
+                    moves.append(E1 | (C1 << TO_SHIFT) | FLAG_CASTLE)
     else:
         # Kingside (O-O)
-        if "k" in pos.castling:
+        if pos.castling_rights & CASTLE_BK:
             # Check squares between king and rook are empty
             if not (pos.all_occ & ((1 << F8) | (1 << G8))):
                 # Check king is not in check and doesn't pass through check
                 if (not is_square_attacked(pos, E8, "w") and
                     not is_square_attacked(pos, F8, "w") and
                     not is_square_attacked(pos, G8, "w")):
-                    moves.append(Move(E8, G8))
+                    moves.append(E8 | (G8 << TO_SHIFT) | FLAG_CASTLE)
 
         # Queenside (O-O-O)
-        if "q" in pos.castling:
+        if pos.castling_rights & CASTLE_BQ:
             # Check squares between king and rook are empty (b8, c8, d8)
             if not (pos.all_occ & ((1 << B8) | (1 << C8) | (1 << D8))):
                 # Check king is not in check and doesn't pass through check
                 if (not is_square_attacked(pos, E8, "w") and
                     not is_square_attacked(pos, D8, "w") and
                     not is_square_attacked(pos, C8, "w")):
-                    moves.append(Move(E8, C8))
-    return moves
-
-def generate_pawn_moves(pos: Position) -> list[Move]:
-    moves: list[Move] = []
-    empty = (~pos.all_occ) & MASK64
-
-    if pos.side_to_move == "w":
-        pawns = pos.pieces[PIECE_TO_INDEX["P"]]
-        enemy = pos.black_occ
-
-        # --- Single pushes ---
+                    moves.append(E8 | (C8 << TO_SHIFT) | FLAG_CASTLE)
+
+def _add_pawn_moves(
+    moves: list[int], pawns: int, white: bool, empty: int, enemy: int,
+    mask: int = MASK64, noisy: bool = True, quiet: bool = True,
+) -> None:
+    """
+    Pushes, double pushes, captures and promotions (not en passant) for the given pawns.
+    Destination squares are limited to mask, which is how check evasions and pins are applied.
+
+    noisy: captures and queen promotions (pushes and captures)
+    quiet: non-promoting pushes and under-promotions (pushes and captures)
+    """
+    if white:
+        # --- Single and double pushes ---
         single_targets = (pawns << 8) & empty
-
-        promo_pushes = single_targets & RANK_8
-        quiet_pushes = single_targets & ~RANK_8
-
-        t = quiet_pushes
-        while t:
-            to_sq, t = pop_lsb(t)
-            moves.append(Move(to_sq - 8, to_sq))
-
-        t = promo_pushes
-        while t:
-            to_sq, t = pop_lsb(t)
-            from_sq = to_sq - 8
-            for p in PROMOS:
-                moves.append(Move(from_sq, to_sq, p))
-
-        # --- Double pushes (never promotions) ---
-        rank3_targets = ((pawns & RANK_2) << 8) & empty
-        double_targets = (rank3_targets << 8) & empty
-
-        dt = double_targets
-        while dt:
-            to_sq, dt = pop_lsb(dt)
-            moves.append(Move(to_sq - 16, to_sq))
+        double_targets = ((single_targets & RANK_3) << 8) & empty & mask
+        single_targets &= mask
 
         # --- Captures ---
-        captures_left  = ((pawns & ~FILE_A) << 7) & enemy   # NW
-        captures_right = ((pawns & ~FILE_H) << 9) & enemy   # NE
-
-        promo_caps_l = captures_left & RANK_8
-        promo_caps_r = captures_right & RANK_8
-        caps_l = captures_left & ~RANK_8
-        caps_r = captures_right & ~RANK_8
-
-        cl = caps_l
-        while cl:
-            to_sq, cl = pop_lsb(cl)
-            moves.append(Move(to_sq - 7, to_sq))
-
-        cr = caps_r
-        while cr:
-            to_sq, cr = pop_lsb(cr)
-            moves.append(Move(to_sq - 9, to_sq))
-
-        cl = promo_caps_l
-        while cl:
-            to_sq, cl = pop_lsb(cl)
-            from_sq = to_sq - 7
-            for p in PROMOS:
-                moves.append(Move(from_sq, to_sq, p))
-
-        cr = promo_caps_r
-        while cr:
-            to_sq, cr = pop_lsb(cr)
-            from_sq = to_sq - 9
-            for p in PROMOS:
-                moves.append(Move(from_sq, to_sq, p))
-
-        # --- En passant ---
-        if pos.ep_square is not None:
-            ep_bb = 1 << pos.ep_square
-
-            # White captures to ep square from:
-            # - down-left (from_sq = ep - 7) means pawn came from one file right (e.g. e5 -> d6)
-            # - down-right (from_sq = ep - 9)
-            #
-            # Another way: generate the pawn capture target squares and see if ep square is among them.
-            ep_from_left  = ((pawns & ~FILE_A) << 7) & ep_bb   # pawn that could capture NW onto ep
-            ep_from_right = ((pawns & ~FILE_H) << 9) & ep_bb   # pawn that could capture NE onto ep
-
-            if ep_from_left:
-                # if ep_from_left is nonzero, there is exactly one pawn that can do it
-                from_sq = pos.ep_square - 7
-                moves.append(Move(from_sq, pos.ep_square))
-
-            if ep_from_right:
-                from_sq = pos.ep_square - 9
-                moves.append(Move(from_sq, pos.ep_square))
+        captures_left  = ((pawns & ~FILE_A) << 7) & enemy & mask   # NW
+        captures_right = ((pawns & ~FILE_H) << 9) & enemy & mask   # NE
 
+        promo_rank = RANK_8
+        # from_sq = to_sq - offset
+        push, left, right = 8, 7, 9
+    else:
+        single_targets = (pawns >> 8) & empty
+        double_targets = ((single_targets & RANK_6) >> 8) & empty & mask
+        single_targets &= mask
+
+        captures_left  = ((pawns & ~FILE_A) >> 9) & enemy & mask   # SW
+        captures_right = ((pawns & ~FILE_H) >> 7) & enemy & mask   # SE
+
+        promo_rank = RANK_1
+        push, left, right = -8, -9, -7
+
+    if quiet:
+        t = single_targets & ~promo_rank
+        for to_sq in squares(t):
+            moves.append((to_sq - push) | (to_sq << TO_SHIFT))
+
+        # Double pushes are never promotions
+        t = double_targets
+        for to_sq in squares(t):
+            moves.append((to_sq - 2 * push) | (to_sq << TO_SHIFT) | FLAG_DOUBLE_PUSH)
+
+    t = single_targets & promo_rank
+    for to_sq in squares(t):
+        move = (to_sq - push) | (to_sq << TO_SHIFT)
+        if noisy:
+            moves.append(move | QUEEN_PROMO)
+        if quiet:
+            for p in UNDER_PROMOS:
+                moves.append(move | p)
+
+    for captures, offset in ((captures_left, left), (captures_right, right)):
+        if noisy:
+            t = captures & ~promo_rank
+            for to_sq in squares(t):
+                moves.append((to_sq - offset) | (to_sq << TO_SHIFT) | FLAG_CAPTURE)
+
+        t = captures & promo_rank
+        for to_sq in squares(t):
+            move = (to_sq - offset) | (to_sq << TO_SHIFT) | FLAG_CAPTURE
+            if noisy:
+                moves.append(move | QUEEN_PROMO)
+            if quiet:
+                for p in UNDER_PROMOS:
+                    moves.append(move | p)
+
+def generate_pawn_moves(pos: Position) -> list[int]:
+    moves: list[int] = []
+    empty = (~pos.all_occ) & MASK64
 
+    if pos.stm == WHITE:
+        pawns = pos.pieces[PIECE_TO_INDEX["P"]]
+        enemy = pos.black_occ
+        white = True
     else:
         pawns = pos.pieces[PIECE_TO_INDEX["p"]]
         enemy = pos.white_occ
+        white = False
 
-        # --- Single pushes ---
-        single_targets = (pawns >> 8) & empty
-
-        promo_pushes = single_targets & RANK_1
-        quiet_pushes = single_targets & ~RANK_1
-
-        t = quiet_pushes
-        while t:
-            to_sq, t = pop_lsb(t)
-            moves.append(Move(to_sq + 8, to_sq))
-
-        t = promo_pushes
-        while t:
-            to_sq, t = pop_lsb(t)
-            from_sq = to_sq + 8
-            for p in PROMOS:
-                moves.append(Move(from_sq, to_sq, p))
-
-        # --- Double pushes ---
-        rank6_targets = ((pawns & RANK_7) >> 8) & empty
-        double_targets = (rank6_targets >> 8) & empty
-
-        dt = double_targets
-        while dt:
-            to_sq, dt = pop_lsb(dt)
-            moves.append(Move(to_sq + 16, to_sq))
-
-        # --- Captures ---
-        captures_left  = ((pawns & ~FILE_A) >> 9) & enemy   # SW
-        captures_right = ((pawns & ~FILE_H) >> 7) & enemy   # SE
-
-        promo_caps_l = captures_left & RANK_1
-        promo_caps_r = captures_right & RANK_1
-        caps_l = captures_left & ~RANK_1
-        caps_r = captures_right & ~RANK_1
-
-        cl = caps_l
-        while cl:
-            to_sq, cl = pop_lsb(cl)
-            moves.append(Move(to_sq + 9, to_sq))
-
-        cr = caps_r
-        while cr:
-            to_sq, cr = pop_lsb(cr)
-            moves.append(Move(to_sq + 7, to_sq))
-
-        cl = promo_caps_l
-        while cl:
-            to_sq, cl = pop_lsb(cl)
-            from_sq = to_sq + 9
-            for p in PROMOS:
-                moves.append(Move(from_sq, to_sq, p))
-
-        cr = promo_caps_r
-        while cr:
-            to_sq, cr = pop_lsb(cr)
-            from_sq = to_sq + 7
-            for p in PROMOS:
-                moves.append(Move(from_sq, to_sq, p))
-
-        # --- En passant ---
-        if pos.ep_square is not None:
-            ep_bb = 1 << pos.ep_square
-
-            # Black captures "down" (towards decreasing ranks), but our shifts already encode that.
-            # Black pawn capture targets are:
-            # - >> 9 (from pawn perspective) and >> 7
-            ep_from_left  = ((pawns & ~FILE_A) >> 9) & ep_bb
-            ep_from_right = ((pawns & ~FILE_H) >> 7) & ep_bb
-
-            if ep_from_left:
-                from_sq = pos.ep_square + 9
-                moves.append(Move(from_sq, pos.ep_square))
-
-            if ep_from_right:
-                from_sq = pos.ep_square + 7
-                moves.append(Move(from_sq, pos.ep_square))
+    _add_pawn_moves(moves, pawns, white, empty, enemy)
 
+    # --- En passant ---
+    if pos.ep_square is not None:
+        # Our pawns that could capture onto the ep square stand where an enemy
+        # pawn on the ep square would attack
+        t = PAWN_ATTACKS[1 if white else 0][pos.ep_square] & pawns
+        for from_sq in squares(t):
+            moves.append(from_sq | (pos.ep_square << TO_SHIFT) | FLAG_CAPTURE | FLAG_EP)
 
     return moves
 
 
-def generate_rook_moves(pos: Position) -> list[Move]:
-    moves: list[Move] = []
+def generate_rook_moves(pos: Position) -> list[int]:
+    moves: list[int] = []
 
-    if pos.side_to_move == "w":
+    if pos.stm == WHITE:
         rooks = pos.pieces[PIECE_TO_INDEX["R"]]
         own_occ = pos.white_occ
+        enemy_occ = pos.black_occ
     else:
         rooks = pos.pieces[PIECE_TO_INDEX["r"]]
         own_occ = pos.black_occ
+        enemy_occ = pos.white_occ
 
     bb = rooks
-    while bb:
-        from_sq, bb = pop_lsb(bb)
+    for from_sq in squares(bb):
         attacks = rook_attacks(from_sq, pos.all_occ)
         targets = attacks & ~own_occ
-
-        t = targets
-        while t:
-            to_sq, t = pop_lsb(t)
-            moves.append(Move(from_sq, to_sq))
+        _add_piece_moves(moves, from_sq, targets, enemy_occ)
 
     return moves
 
-def generate_bishop_moves(pos: Position) -> list[Move]:
-    moves: list[Move] = []
+def generate_bishop_moves(pos: Position) -> list[int]:
+    moves: list[int] = []
 
-    if pos.side_to_move == "w":
+    if pos.stm == WHITE:
         bishops = pos.pieces[PIECE_TO_INDEX["B"]]
         own_occ = pos.white_occ
+        enemy_occ = pos.black_occ
     else:
         bishops = pos.pieces[PIECE_TO_INDEX["b"]]
         own_occ = pos.black_occ
+        enemy_occ = pos.white_occ
 
     bb = bishops
-    while bb:
-        from_sq, bb = pop_lsb(bb)
+    for from_sq in squares(bb):
         attacks = bishop_attacks(from_sq, pos.all_occ)
         targets = attacks & ~own_occ
-
-        t = targets
-        while t:
-            to_sq, t = pop_lsb(t)
-            moves.append(Move(from_sq, to_sq))
+        _add_piece_moves(moves, from_sq, targets, enemy_occ)
 
     return moves
 
-def generate_queen_moves(pos: Position) -> list[Move]:
-    moves: list[Move] = []
+def generate_queen_moves(pos: Position) -> list[int]:
+    moves: list[int] = []
 
-    if pos.side_to_move == "w":
+    if pos.stm == WHITE:
         queens = pos.pieces[PIECE_TO_INDEX["Q"]]
         own_occ = pos.white_occ
+        enemy_occ = pos.black_occ
     else:
         queens = pos.pieces[PIECE_TO_INDEX["q"]]
         own_occ = pos.black_occ
+        enemy_occ = pos.white_occ
 
     bb = queens
-    while bb:
-        from_sq, bb = pop_lsb(bb)
+    for from_sq in squares(bb):
         attacks = queen_attacks(from_sq, pos.all_occ)
         targets = attacks & ~own_occ
-
-        t = targets
-        while t:
-            to_sq, t = pop_lsb(t)
-            moves.append(Move(from_sq, to_sq))
+        _add_piece_moves(moves, from_sq, targets, enemy_occ)
 
     return moves
 
 
-def generate_all_moves(pos: Position) -> list[Move]:
+def generate_all_moves(pos: Position) -> list[int]:
     """Generate all pseudo-legal moves for the current position."""
-    moves: list[Move] = []
+    moves: list[int] = []
     moves.extend(generate_pawn_moves(pos))
     moves.extend(generate_knight_moves(pos))
     moves.extend(generate_bishop_moves(pos))
@@ -359,23 +280,229 @@ def generate_all_moves(pos: Position) -> list[Move]:
     moves.extend(generate_king_moves(pos))
     return moves
 
-def generate_legal_moves(pos: Position) -> list[Move]:
+def _is_noisy(move: int) -> bool:
+    """Captures and queen promotions, the moves generate_captures produces."""
+    promo = move & PROMO_MASK
+    return promo == QUEEN_PROMO or (not promo and bool(move & FLAG_CAPTURE))
+
+def _generate_legal(pos: Position, noisy: bool, quiet: bool) -> list[int]:
+    """
+    Generate legal moves for the current position.
+
+    noisy: captures (including en passant) and queen promotions
+    quiet: everything else, including castling and under-promotions
+
+    Instead of making every pseudo-legal move and testing for check, we work out
+    once per position which enemy pieces give check and which of our pieces are
+    pinned, then restrict each piece's destination squares accordingly:
+
+      - In double check only the king can move.
+      - In single check other pieces must capture the checker or block (check_mask).
+      - A pinned piece may only move along the line between king and pinner.
+      - King moves are tested against enemy attacks with the king lifted off the
+        board, so it can't step backwards along a slider's line.
+      - En passant can expose the king along the rank (both pawns leave it),
+        so it gets a direct occupancy test.
+    """
+    moves: list[int] = []
+    pieces = pos.pieces
+
+    if pos.stm == WHITE:
+        us, them = 0, 6
+        own_occ, enemy_occ = pos.white_occ, pos.black_occ
+        white = True
+        enemy = "b"
+    else:
+        us, them = 6, 0
+        own_occ, enemy_occ = pos.black_occ, pos.white_occ
+        white = False
+        enemy = "w"
+
+    occ = pos.all_occ
+    king_bb = pieces[us + 5]
+    if not king_bb:
+        # No king (test positions): nothing can be illegal
+        return [m for m in generate_all_moves(pos) if (noisy if _is_noisy(m) else quiet)]
+    king_sq = msb(king_bb)
+
+    enemy_rooks = pieces[them + 3] | pieces[them + 4]
+    enemy_bishops = pieces[them + 2] | pieces[them + 4]
+
+    checkers = (
+        (PAWN_ATTACKS[0 if white else 1][king_sq] & pieces[them])
+        | (KNIGHT_ATTACKS[king_sq] & pieces[them + 1])
+        | (rook_attacks(king_sq, occ) & enemy_rooks)
+        | (bishop_attacks(king_sq, occ) & enemy_bishops)
+    )
+
+    # Squares each kind of move is allowed to land on
+    empty = ~occ & MASK64
+    allowed = (enemy_occ if noisy else 0) | (empty if quiet else 0)
+
+    # --- King moves ---
+    occ_without_king = occ ^ king_bb
+    t = KING_ATTACKS[king_sq] & allowed
+    for to_sq in squares(t):
+        if not is_square_attacked(pos, to_sq, enemy, occ_without_king):
+            if SQUARE_BB[to_sq] & enemy_occ:
+                moves.append(king_sq | (to_sq << TO_SHIFT) | FLAG_CAPTURE)
+            else:
+                moves.append(king_sq | (to_sq << TO_SHIFT))
+
+    # Double check: king moves are all we have
+    if checkers & (checkers - 1):
+        return moves
+
+    if checkers:
+        checker_sq = msb(checkers)
+        check_mask = BETWEEN[king_sq][checker_sq] | checkers
+    else:
+        check_mask = MASK64
+        if quiet:
+            _add_castling_moves(moves, pos)
+
+    # --- Pins ---
+    # Enemy sliders that would hit our king if only enemy pieces blocked them.
+    # If exactly one piece stands in between and it's ours, it's pinned.
+    pinned = 0
+    pin_rays = {}
+    snipers = (rook_attacks(king_sq, enemy_occ) & enemy_rooks) | (bishop_attacks(king_sq, enemy_occ) & enemy_bishops)
+    for sniper_sq in squares(snipers):
+        between = BETWEEN[king_sq][sniper_sq]
+        blockers = between & occ
+        if blockers & own_occ and not blockers & (blockers - 1):
+            pinned |= blockers
+            pin_rays[msb(blockers)] = between | SQUARE_BB[sniper_sq]
+
+    targets = allowed & check_mask
+
+    # --- Knights (a pinned knight can never move) ---
+    bb = pieces[us + 1] & ~pinned
+    for from_sq in squares(bb):
+        _add_piece_moves(moves, from_sq, KNIGHT_ATTACKS[from_sq] & targets, enemy_occ)
+
+    # --- Sliders ---
+    for piece_bb, attack_fn in (
+        (pieces[us + 2], bishop_attacks),
+        (pieces[us + 3], rook_attacks),
+        (pieces[us + 4], queen_attacks),
+    ):
+        bb = piece_bb
+        for from_sq in squares(bb):
+            piece_targets = attack_fn(from_sq, occ) & targets
+            if pinned & SQUARE_BB[from_sq]:
+                piece_targets &= pin_rays[from_sq]
+            _add_piece_moves(moves, from_sq, piece_targets, enemy_occ)
+
+    # --- Pawns ---
+    pawns = pieces[us]
+    _add_pawn_moves(moves, pawns & ~pinned, white, empty, enemy_occ, check_mask, noisy, quiet)
+
+    bb = pawns & pinned
+    for from_sq in squares(bb):
+        _add_pawn_moves(moves, SQUARE_BB[from_sq], white, empty, enemy_occ, check_mask & pin_rays[from_sq], noisy, quiet)
+
+    # --- En passant ---
+    ep = pos.ep_square
+    if noisy and ep is not None:
+        captured_sq = ep - 8 if white else ep + 8
+        captured_bb = SQUARE_BB[captured_sq]
+        ep_bb = SQUARE_BB[ep]
+        t = PAWN_ATTACKS[1 if white else 0][ep] & pawns
+        for from_sq in squares(t):
+            # Play it out on the occupancy and see if any slider now hits the king.
+            # Knight/pawn checks are only resolved by taking the checking pawn.
+            after = (occ ^ SQUARE_BB[from_sq] ^ captured_bb) | ep_bb
+            if checkers and not checkers & captured_bb and not ep_bb & check_mask:
+                continue
+            if rook_attacks(king_sq, after) & enemy_rooks or bishop_attacks(king_sq, after) & enemy_bishops:
+                continue
+            moves.append(from_sq | (ep << TO_SHIFT) | FLAG_CAPTURE | FLAG_EP)
+
+    return moves
+
+def generate_legal_moves(pos: Position) -> list[int]:
     """Generate all legal moves for the current position."""
-    pseudo_legal = generate_all_moves(pos)
-    return [move for move in pseudo_legal if is_legal(pos, move)]
+    return _generate_legal(pos, True, True)
+
+
+def find_move(pos: Position, uci_str: str) -> int | None:
+    """Find the pseudo-legal move matching a UCI string like 'e2e4' or 'e7e8q'."""
+    for move in generate_all_moves(pos):
+        if move_to_uci(move) == uci_str:
+            return move
+    return None
 
 
+def is_pseudo_legal(pos: Position, move: int) -> bool:
+    """
+    Would generate_all_moves produce this move here? For moves that come from
+    another position, like the TT move or killers, before they are played.
+    """
+    if move == NO_MOVE:
+        return False
+
+    from_sq = move & 63
+    piece = pos.board[from_sq]
+    white = pos.stm == WHITE
+    if piece is None or (piece < 6) != white:
+        return False
+
+    if white:
+        own_occ, enemy_occ = pos.white_occ, pos.black_occ
+    else:
+        own_occ, enemy_occ = pos.black_occ, pos.white_occ
+
+    kind = piece % 6
+    if kind == 0:
+        # Pawns: compare against everything this one pawn can do
+        moves: list[int] = []
+        pawn_bb = SQUARE_BB[from_sq]
+        _add_pawn_moves(moves, pawn_bb, white, ~pos.all_occ & MASK64, enemy_occ)
+        ep = pos.ep_square
+        if ep is not None and PAWN_ATTACKS[1 if white else 0][ep] & pawn_bb:
+            moves.append(from_sq | (ep << TO_SHIFT) | FLAG_CAPTURE | FLAG_EP)
+        return move in moves
+
+    if move & (FLAG_EP | FLAG_DOUBLE_PUSH | PROMO_MASK):
+        return False
+    if move & FLAG_CASTLE:
+        if kind != 5:
+            return False
+        moves = []
+        _add_castling_moves(moves, pos)
+        return move in moves
+
+    to_bb = SQUARE_BB[(move >> TO_SHIFT) & 63]
+    if to_bb & own_occ:
+        return False
+    # The capture flag has to match what is on the target square
+    if bool(move & FLAG_CAPTURE) != bool(to_bb & enemy_occ):
+        return False
+
+    if kind == 1:
+        attacks = KNIGHT_ATTACKS[from_sq]
+    elif kind == 2:
+        attacks = bishop_attacks(from_sq, pos.all_occ)
+    elif kind == 3:
+        attacks = rook_attacks(from_sq, pos.all_occ)
+    elif kind == 4:
+        attacks = queen_attacks(from_sq, pos.all_occ)
+    else:
+        attacks = KING_ATTACKS[from_sq]
+    return bool(attacks & to_bb)
+
 
 def is_in_check(pos: Position) -> bool:
     # Find our king
-    if pos.side_to_move == "w":
+    if pos.stm == WHITE:
         king_bb = pos.pieces[PIECE_TO_INDEX["K"]]
         enemy = "b"
     else:
         king_bb = pos.pieces[PIECE_TO_INDEX["k"]]
         enemy = "w"
-    
-    king_sq, _ = pop_lsb(king_bb)
+
+    king_sq = msb(king_bb)
     return is_square_attacked(pos, king_sq, enemy)
 
 def is_checkmate(pos: Position) -> bool:
@@ -388,21 +515,14 @@ def is_stalemate(pos: Position) -> bool:
     return not is_in_check(pos) and len(generate_legal_moves(pos)) == 0
 
 
-def generate_captures(pos: Position) -> list[Move]:
-    """Generate only capture moves."""
-    all_moves = generate_all_moves(pos)
-    enemy_occ = pos.black_occ if pos.side_to_move == "w" else pos.white_occ
-    
-    captures = []
-    for move in all_moves:
-        # Check if to_sq has an enemy piece
-        if (1 << move.to_sq) & enemy_occ:
-            captures.append(move)
-        # Also include en passant (it's a capture but to_sq is empty)
-        elif pos.ep_square is not None and move.to_sq == pos.ep_square:
-            # Check if a pawn is making this move
-            pawn_idx = 0 if pos.side_to_move == "w" else 6
-            if (1 << move.from_sq) & pos.pieces[pawn_idx]:
-                captures.append(move)
-    
-    return captures
\ No newline at end of file
+def generate_captures(pos: Position) -> list[int]:
+    """
+    Generate legal captures (including en passant) and queen promotions only.
+    Only targets enemy pieces, so quiescence never pays for quiet moves or castling.
+    """
+    return _generate_legal(pos, True, False)
+
+
+def generate_quiets(pos: Position) -> list[int]:
+    """Generate the legal moves generate_captures leaves out: quiet moves, castling and all under-promotions."""
+    return _generate_legal(pos, False, True)
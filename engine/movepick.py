@@ -0,0 +1,103 @@
+# Staged move picker for the main search
+#
+# Instead of generating and sorting every move up front, moves are handed out
+# in stages, best first. Most nodes that fail high do so on the TT move or a
+# good capture, so the quiet moves are never generated or scored there.
+
+from collections.abc import Iterator
+
+from .position import Position
+from .movegen import generate_captures, generate_quiets, is_pseudo_legal
+from .move_validator import is_legal
+from .move import NO_MOVE, TO_SHIFT, PROMO_MASK, FLAG_CAPTURE, FLAG_EP
+from .see import see, SEE_VALUES
+
+# Piece values for move ordering (simpler than evaluation values)
+MVV_LVA_VICTIM = [100, 320, 330, 500, 900, 10000, 100, 320, 330, 500, 900, 10000]
+
+# Captures and promotions are ordered by score_move, everything else is quiet
+NOISY_MASK = FLAG_CAPTURE | PROMO_MASK
+
+
+def score_move(pos: Position, move: int) -> int:
+    """Score a move for ordering. Higher = search first."""
+    score = 0
+    
+    # Captures: MVV-LVA
+    if move & FLAG_CAPTURE:
+        # En passant leaves the target square empty, the victim is always a pawn
+        victim = 0 if move & FLAG_EP else pos.piece_at((move >> TO_SHIFT) & 63)
+        attacker = pos.piece_at(move & 63)
+        score += 10000 + MVV_LVA_VICTIM[victim] - MVV_LVA_VICTIM[attacker] // 100
+    
+    # Promotions are good
+    if move & PROMO_MASK:
+        score += 9000
+    
+    return score
+
+
+def is_good_capture(pos: Position, move: int) -> bool:
+    """Capture or promotion that doesn't lose material by SEE."""
+    if move & PROMO_MASK or move & FLAG_EP:
+        return True
+    # Taking something at least as valuable as the capturing piece can't lose
+    victim = pos.board[(move >> TO_SHIFT) & 63] % 6
+    attacker = pos.board[move & 63] % 6
+    if SEE_VALUES[victim] >= SEE_VALUES[attacker]:
+        return True
+    return see(pos, move) >= 0
+
+
+def _playable(pos: Position, move: int) -> bool:
+    """Is a move taken from a table (TT, killers, countermoves) legal here?"""
+    return move != NO_MOVE and is_pseudo_legal(pos, move) and is_legal(pos, move)
+
+
+def pick_moves(
+    pos: Position,
+    tt_move: int,
+    killers: list[int],
+    countermove: int,
+    history: list[int],
+) -> Iterator[int]:
+    """
+    Yield every legal move exactly once, in stages:
+      1. the TT move
+      2. captures and queen promotions that don't lose material (SEE >= 0), best MVV-LVA first
+      3. the two killers, then the countermove
+      4. quiet moves by history score
+      5. losing captures, best MVV-LVA first
+    Each stage is only generated once the previous one is used up.
+    """
+    if _playable(pos, tt_move):
+        yield tt_move
+    else:
+        tt_move = NO_MOVE
+
+    # Selection rather than a full sort, a cutoff usually comes early.
+    # SEE is only worked out for a capture when it is picked.
+    scored = [(score_move(pos, m), m) for m in generate_captures(pos) if m != tt_move]
+    bad_captures = []
+    while scored:
+        best = max(scored)
+        scored.remove(best)
+        if is_good_capture(pos, best[1]):
+            yield best[1]
+        else:
+            bad_captures.append(best[1])
+
+    tried = [tt_move]
+    for move in (killers[0], killers[1], countermove):
+        if move & NOISY_MASK or move in tried:
+            continue
+        if _playable(pos, move):
+            tried.append(move)
+            yield move
+
+    quiets = [m for m in generate_quiets(pos) if m not in tried]
+    quiets.sort(key=lambda m: history[m & 0xFFF], reverse=True)
+    yield from quiets
+
+    # Already in MVV-LVA order
+    yield from bad_captures
@@ -0,0 +1,12 @@
+import sys
+import threading
+
+# The UCI thread and the search thread both talk to the GUI. print() writes the
+# text and the newline separately, so without a lock their lines can interleave.
+_output_lock = threading.Lock()
+
+def send(line: str) -> None:
+    """Write one complete line of engine output to stdout and flush it."""
+    with _output_lock:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
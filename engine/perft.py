@@ -0,0 +1,131 @@
+# Perft: count the leaf nodes of the legal move tree to a fixed depth.
+# Used to validate move generation against known counts and as a
+# throughput benchmark for movegen + make/unmake.
+#
+# Run the reference suite with:  python -m engine.perft [max_depth]
+
+import sys
+import time
+
+from .position import Position
+from .fen import parse_fen
+from .movegen import generate_legal_moves
+from .makeunmake import make_move, unmake_move
+from .move import move_to_uci
+from .output import send
+
+# Standard reference positions with known node counts, indexed by depth - 1
+# https://www.chessprogramming.org/Perft_Results
+PERFT_POSITIONS = [
+    (
+        "startpos",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        [20, 400, 8902, 197281, 4865609, 119060324],
+    ),
+    (
+        "kiwipete",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        [48, 2039, 97862, 4085603, 193690690],
+    ),
+    (
+        "position3",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        [14, 191, 2812, 43238, 674624, 11030083],
+    ),
+    (
+        "position4",
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        [6, 264, 9467, 422333, 15833292],
+    ),
+    (
+        "position5",
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        [44, 1486, 62379, 2103487, 89941194],
+    ),
+    (
+        "position6",
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        [46, 2079, 89890, 3894594, 164075551],
+    ),
+]
+
+
+def perft(pos: Position, depth: int) -> int:
+    """Count leaf nodes at the given depth."""
+    if depth == 0:
+        return 1
+
+    moves = generate_legal_moves(pos)
+
+    # Bulk counting: at depth 1 the number of legal moves is the answer
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        make_move(pos, move)
+        nodes += perft(pos, depth - 1)
+        unmake_move(pos)
+    return nodes
+
+
+def divide(pos: Position, depth: int) -> dict[str, int]:
+    """Perft split by root move, keyed by UCI move string. Handy for finding movegen bugs."""
+    counts = {}
+    for move in generate_legal_moves(pos):
+        make_move(pos, move)
+        counts[move_to_uci(move)] = perft(pos, depth - 1) if depth > 1 else 1
+        unmake_move(pos)
+    return counts
+
+
+def run_perft(pos: Position, depth: int, show_divide: bool = True) -> tuple[int, float]:
+    """Send a divide (optional) and node/time/nps summary as UCI output. Returns (nodes, seconds)."""
+    start = time.perf_counter()
+    if show_divide:
+        counts = divide(pos, depth)
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(pos, depth)
+    elapsed = time.perf_counter() - start
+
+    if show_divide:
+        for uci_move, count in counts.items():
+            send(f"{uci_move}: {count}")
+        send("")
+
+    nps = int(nodes / elapsed) if elapsed > 0 else 0
+    send(f"Nodes searched: {nodes}")
+    send(f"Time: {int(elapsed * 1000)} ms, NPS: {nps}")
+    return nodes, elapsed
+
+
+def run_suite(max_depth: int = 3) -> bool:
+    """Run every reference position up to max_depth. Returns True if all counts match."""
+    all_ok = True
+    total_nodes = 0
+    total_time = 0.0
+
+    for name, fen, expected in PERFT_POSITIONS:
+        for depth in range(1, min(max_depth, len(expected)) + 1):
+            pos = parse_fen(fen)
+            start = time.perf_counter()
+            nodes = perft(pos, depth)
+            elapsed = time.perf_counter() - start
+            total_nodes += nodes
+            total_time += elapsed
+
+            ok = nodes == expected[depth - 1]
+            all_ok = all_ok and ok
+            nps = int(nodes / elapsed) if elapsed > 0 else 0
+            status = "ok" if ok else f"FAIL (expected {expected[depth - 1]})"
+            print(f"{name:<10} depth {depth}: {nodes:>10} nodes {elapsed:8.3f}s {nps:>8} nps  {status}")
+
+    nps = int(total_nodes / total_time) if total_time > 0 else 0
+    print(f"Total: {total_nodes} nodes in {total_time:.3f}s ({nps} nps)")
+    return all_ok
+
+
+if __name__ == "__main__":
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    sys.exit(0 if run_suite(depth) else 1)
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+from .move import NO_MOVE
+
 # There are 12 bitboards per position: one per piece type per color
 # White: P N B R Q K
 # Black: p n b r q k
@@ -7,6 +9,33 @@ from dataclasses import dataclass
 PIECE_ORDER = "PNBRQKpnbrqk"
 PIECE_TO_INDEX = {p: i for i, p in enumerate(PIECE_ORDER)}
 
+# Side to move
+WHITE = 0
+BLACK = 1
+
+# Castling rights, one bit each. The bit order matches "KQkq" in FEN.
+CASTLE_WK = 1
+CASTLE_WQ = 2
+CASTLE_BK = 4
+CASTLE_BQ = 8
+CASTLING_CHARS = "KQkq"
+
+def castling_from_str(castling: str) -> int:
+    """FEN castling field ("KQkq", "Kq", "-", ...) to a rights mask."""
+    rights = 0
+    for i, ch in enumerate(CASTLING_CHARS):
+        if ch in castling:
+            rights |= 1 << i
+    return rights
+
+def castling_to_str(rights: int) -> str:
+    """Rights mask back to the FEN castling field."""
+    s = "".join(ch for i, ch in enumerate(CASTLING_CHARS) if rights & (1 << i))
+    return s if s else "-"
+
+# Initial size of the undo stack. Grows if a game goes past it.
+UNDO_STACK_SIZE = 1024
+
 @dataclass(slots=True)
 class Position:
     # 12 piece bitboards in order of PIECE_ORDER
@@ -18,12 +47,34 @@ class Position:
     all_occ: int
 
     # Game state
-    side_to_move: str       # "w" or "b"
-    castling: str           # "KQkq" or "-" (matches FEN way of storing castling rights)
+    stm: int                # WHITE or BLACK
+    castling_rights: int    # CASTLE_* bits
     ep_square: int | None   # En passant square, if applicable
     halfmove_clock: int     # Half move is one side only (black move or white move). Exists for 50 move rule
     fullmove_number: int    # Move number
 
+    # Mailbox: board[sq] is the PIECE_ORDER index of the piece on sq, or None.
+    # Kept in sync with the bitboards so "what is on this square" is one lookup.
+    board: list[int | None]
+
+    # Zobrist hash of the position, kept up to date incrementally by make_move
+    hash: int
+
+    # Zobrist key of the pawns only (see zobrist.hash_pawns), for the pawn hash table
+    pawn_hash: int
+
+    # Packed middlegame/endgame material + piece-square score from white's
+    # point of view (see evaluation.PST), also kept up to date by make_move
+    psqt: int
+
+    # Game phase from non-pawn material (see evaluation.PHASE_WEIGHTS), kept up to date by make_move
+    phase: int
+
+    # Undo records pushed by make_move and popped by unmake_move.
+    # Preallocated, undo_ply points at the next free slot.
+    undo_stack: list[tuple | None]
+    undo_ply: int
+
     @staticmethod
     def empty() -> "Position":
         return Position(
@@ -31,11 +82,18 @@ class Position:
             white_occ=0,
             black_occ=0,
             all_occ=0,
-            side_to_move="w",
-            castling="-",
+            stm=WHITE,
+            castling_rights=0,
             ep_square=None,
             halfmove_clock=0,
             fullmove_number=1,
+            board=[None] * 64,
+            hash=0,
+            pawn_hash=0,
+            psqt=0,
+            phase=0,
+            undo_stack=[None] * UNDO_STACK_SIZE,
+            undo_ply=0,
         )
     
     def recompute_occupancy(self) -> None:
@@ -49,30 +107,80 @@ class Position:
         self.black_occ = b
         self.all_occ = w | b
 
+    # FEN style accessors, kept for callers that think in "w"/"b" and "KQkq"
+    @property
+    def side_to_move(self) -> str:
+        return "w" if self.stm == WHITE else "b"
+
+    @side_to_move.setter
+    def side_to_move(self, value: str) -> None:
+        self.stm = WHITE if value == "w" else BLACK
+
+    @property
+    def castling(self) -> str:
+        return castling_to_str(self.castling_rights)
+
+    @castling.setter
+    def castling(self, value: str) -> None:
+        self.castling_rights = castling_from_str(value)
+
+    def is_repetition(self, ply: int) -> bool:
+        """
+        Is this a draw by repetition? The hashes from before each move are on
+        the undo stack, so we scan back over them. Only positions with the same
+        side to move count (every second entry), and only back to the last
+        capture, pawn move or null move, since nothing before that can repeat.
+
+        ply is how far the search is from its root. A repeat of a position
+        inside the search counts straight away (twofold), since whatever
+        we did to get back there we could do again. Positions from the game
+        before the root need two earlier occurrences (threefold).
+        """
+        h = self.hash
+        stack = self.undo_stack
+        top = self.undo_ply
+        window = min(self.halfmove_clock, top)
+        seen = 0
+        for back in range(1, window + 1):
+            record = stack[top - back]
+            if record[0] == NO_MOVE:
+                break
+            if back & 1 or back < 4 or record[6] != h:
+                continue
+            if back < ply:
+                return True
+            seen += 1
+            if seen >= 2:
+                return True
+        return False
+
+    def piece_at(self, sq: int) -> int | None:
+        """PIECE_ORDER index of the piece on sq, or None if the square is empty."""
+        return self.board[sq]
+
     def copy(self) -> "Position":
         return Position(
             self.pieces.copy(),
             self.white_occ,
             self.black_occ,
             self.all_occ,
-            self.side_to_move,
-            self.castling,
+            self.stm,
+            self.castling_rights,
             self.ep_square,
             self.halfmove_clock,
-            self.fullmove_number
+            self.fullmove_number,
+            self.board.copy(),
+            self.hash,
+            self.pawn_hash,
+            self.psqt,
+            self.phase,
+            self.undo_stack.copy(),
+            self.undo_ply,
         )
 
 # Pretty print for debugging
 def pretty(pos: Position) -> str:
-    board = ["." for _ in range(64)]
-    # Fill squares by scanning bitboards
-    for piece_char, idx in PIECE_TO_INDEX.items():
-        bb = pos.pieces[idx]
-        while bb:
-            lsb = bb & -bb
-            sq = lsb.bit_length() - 1
-            board[sq] = piece_char
-            bb ^= lsb
+    board = ["." if idx is None else PIECE_ORDER[idx] for idx in pos.board]
     lines = []
     for rank in range(7, -1, -1):
         row = board[rank * 8 : rank * 8 + 8]
@@ -1,55 +1,242 @@
-from .position import Position
-from .movegen import generate_legal_moves, is_in_check, generate_captures
-from .makeunmake import make_move
-from .evaluation import evaluate
-from .move import Move
+import threading
+import time
+from dataclasses import dataclass, field
+
+from .position import Position, WHITE
+from .movegen import generate_legal_moves, is_in_check, generate_captures, is_pseudo_legal
+from .makeunmake import make_move, unmake_move, make_null_move, unmake_null_move
+from .evaluation import evaluate_relative, eval_cache
+from .move import Move, NO_MOVE, TO_SHIFT, PROMO_MASK, FLAG_EP, move_to_uci
+from .see import see, SEE_VALUES
+from .movepick import pick_moves, score_move, NOISY_MASK
 from .move_validator import is_legal
-from .zobrist import hash_position
+from .tt import TranspositionTable, EXACT, LOWER, UPPER
+from .timeman import SearchLimits, allocate_time
+from .output import send
 
 INFINITY = 999_999
 CHECKMATE_SCORE = 100_000
 
-# Piece values for move ordering (simpler than evaluation values)
-MVV_LVA_VICTIM = [100, 320, 330, 500, 900, 10000, 100, 320, 330, 500, 900, 10000]
+# Move ordering bonus for the best move stored in the transposition table
+TT_MOVE_SCORE = 1_000_000
 
-def get_piece_at(pos: Position, sq: int) -> int | None:
-    """Return piece index at square, or None if empty."""
-    mask = 1 << sq
-    for i in range(12):
-        if pos.pieces[i] & mask:
-            return i
-    return None
+# Quiescence skips a capture if the captured piece plus this margin can't reach alpha
+DELTA_MARGIN = 200
 
+# Null move pruning: reduction R, bigger above NULL_MOVE_DEEP_DEPTH
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_R = 2
+NULL_MOVE_R_DEEP = 3
+NULL_MOVE_DEEP_DEPTH = 6
 
-def score_move(pos: Position, move: Move) -> int:
-    """Score a move for ordering. Higher = search first."""
-    score = 0
-    
-    # Captures: MVV-LVA
-    victim = get_piece_at(pos, move.to_sq)
-    if victim is not None:
-        attacker = get_piece_at(pos, move.from_sq)
-        if attacker is not None:
-            score += 10000 + MVV_LVA_VICTIM[victim] - MVV_LVA_VICTIM[attacker] // 100
-    
-    # Promotions are good
-    if move.promo:
-        score += 9000
-    
+# Late move reductions: the first LMR_FULL_MOVES moves are never reduced,
+# moves after LMR_LATE_MOVES are reduced by two plies instead of one
+LMR_MIN_DEPTH = 3
+LMR_FULL_MOVES = 3
+LMR_LATE_MOVES = 6
+
+# When a history entry reaches this the whole table is halved
+HISTORY_MAX = 5000
+
+# Deepest ply the PV and killer tables are sized for
+MAX_PLY = 128
+
+# Half-width of the first aspiration window around the previous iteration's score.
+# Doubled on every fail high/low until the search fits inside it.
+ASPIRATION_WINDOW = 50
+
+# After this many failed re-searches the window opens fully. A big swing
+# (a mate, a lost piece) would otherwise take many doublings to reach.
+ASPIRATION_MAX_FAILS = 2
+
+# Scores this far from zero are mates, aspiration windows are skipped for them
+MATE_BOUND = CHECKMATE_SCORE - 1000
+
+# How often (in nodes) the search looks at the clock and node limit
+CHECK_INTERVAL = 512
+
+# Depth used when go gives no depth, time or node limit at all
+DEFAULT_DEPTH = 5
+
+# Shared transposition table, resized through the UCI Hash option
+tt = TranspositionTable()
+
+# Held while the search's limits are swapped or its clock is (re)started, so a
+# ponderhit from the UCI thread cannot interleave with SearchInfo.reset
+_clock_lock = threading.Lock()
+
+def order_moves(pos: Position, moves: list[int], tt_move: int = NO_MOVE) -> list[int]:
+    """Order a full move list: TT move first, then captures and promotions."""
+    if tt_move == NO_MOVE:
+        return sorted(moves, key=lambda m: score_move(pos, m), reverse=True)
+    return sorted(
+        moves,
+        key=lambda m: TT_MOVE_SCORE if m == tt_move else score_move(pos, m),
+        reverse=True,
+    )
+
+@dataclass(slots=True)
+class SearchInfo:
+    """Counters and principal variation for the search in progress."""
+    nodes: int = 0
+    start_time: float = 0.0
+    limits: SearchLimits = field(default_factory=SearchLimits)
+    stm: int = 0
+
+    # Limits for this search. Deadlines are perf_counter() timestamps.
+    soft_deadline: float | None = None
+    hard_deadline: float | None = None
+    node_limit: int | None = None
+
+    # Set when a limit is hit mid-iteration, everything unwinds and the
+    # result of the last completed iteration is used
+    stopped: bool = False
+
+    # pv_table[ply] is the best line found from ply onwards in the current iteration
+    pv_table: list[list[int]] = field(default_factory=list)
+
+    # Principal variation of the last completed iteration, followed first by the next one
+    prev_pv: list[int] = field(default_factory=list)
+    follow_pv: bool = False
+
+    # Quiet move ordering tables, all indexed by the from/to bits of a move (move & 0xFFF).
+    #   killers[ply]      - two quiet moves that caused a beta cutoff at this ply
+    #   history[stm]      - butterfly table, grows with depth^2 on every quiet cutoff
+    #   countermoves[prev] - the quiet move that refuted prev last time
+    killers: list[list[int]] = field(default_factory=lambda: [[NO_MOVE, NO_MOVE] for _ in range(MAX_PLY + 1)])
+    history: list[list[int]] = field(default_factory=lambda: [[0] * 4096, [0] * 4096])
+    countermoves: list[int] = field(default_factory=lambda: [NO_MOVE] * 4096)
+
+    def reset(self, limits: SearchLimits, stm: int) -> None:
+        self.nodes = 0
+        self.start_time = time.perf_counter()
+        with _clock_lock:
+            self.limits = limits
+            self.stm = stm
+            self.start_clock(self.start_time)
+        self.node_limit = limits.nodes
+        self.stopped = False
+        self.pv_table = [[] for _ in range(MAX_PLY + 1)]
+        self.prev_pv = []
+        self.follow_pv = False
+        # Killers are position specific, history is only aged so it still
+        # helps the next search (usually two plies further into the game)
+        self.killers = [[NO_MOVE, NO_MOVE] for _ in range(MAX_PLY + 1)]
+        self.age_history()
+
+    def clear_heuristics(self) -> None:
+        """Forget everything learned about move ordering, e.g. for a new game."""
+        self.killers = [[NO_MOVE, NO_MOVE] for _ in range(MAX_PLY + 1)]
+        self.history = [[0] * 4096, [0] * 4096]
+        self.countermoves = [NO_MOVE] * 4096
+
+    def age_history(self) -> None:
+        for table in self.history:
+            for i in range(4096):
+                table[i] >>= 1
+
+    def countermove(self, pos: Position) -> int:
+        """Stored reply to the move that led to pos, NO_MOVE at the root."""
+        if pos.undo_ply == 0:
+            return NO_MOVE
+        return self.countermoves[pos.undo_stack[pos.undo_ply - 1][0] & 0xFFF]
+
+    def update_quiet_cutoff(self, pos: Position, move: int, ply: int, depth: int, tried: list[int]) -> None:
+        """A quiet move failed high. tried holds the quiet moves searched before it."""
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+        if pos.undo_ply > 0:
+            self.countermoves[pos.undo_stack[pos.undo_ply - 1][0] & 0xFFF] = move
+
+        # Reward the cutoff move, and penalise the quiets that didn't cut
+        history = self.history[pos.stm]
+        bonus = depth * depth
+        for m in tried:
+            idx = m & 0xFFF
+            history[idx] = max(0, history[idx] - bonus)
+        idx = move & 0xFFF
+        history[idx] += bonus
+        if history[idx] >= HISTORY_MAX:
+            self.age_history()
+
+    def start_clock(self, now: float) -> None:
+        """Set the deadlines from the time budget, counting from now."""
+        soft_ms, hard_ms = allocate_time(self.limits, self.stm)
+        self.soft_deadline = None if soft_ms is None else now + soft_ms / 1000
+        self.hard_deadline = None if hard_ms is None else now + hard_ms / 1000
+
+# State of the current search, reset by search()
+info = SearchInfo()
+
+# Set from another thread (UCI stop/quit) to abort the search in progress.
+# Cleared by whoever starts the next search.
+stop_event = threading.Event()
+
+@dataclass(slots=True)
+class SearchOptions:
+    """Selectivity switches, exposed as UCI options so each can be tested on its own."""
+    pvs: bool = True
+    null_move: bool = True
+    lmr: bool = True
+
+options = SearchOptions()
+
+def has_non_pawn_material(pos: Position) -> bool:
+    """Does the side to move have a knight, bishop, rook or queen?"""
+    base = 0 if pos.stm == WHITE else 6
+    pieces = pos.pieces
+    return bool(pieces[base + 1] | pieces[base + 2] | pieces[base + 3] | pieces[base + 4])
+
+def score_to_tt(score: int, ply: int) -> int:
+    """
+    Mate scores are relative to the root while searching. The TT stores them
+    relative to the position itself, so they stay right when the position
+    shows up again at a different ply.
+    """
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
     return score
 
+def score_from_tt(score: int, ply: int) -> int:
+    """Inverse of score_to_tt."""
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
 
-def order_moves(pos: Position, moves: list[Move]) -> list[Move]:
-    """Order moves: captures and promotions first."""
-    return sorted(moves, key=lambda m: score_move(pos, m), reverse=True)
+def new_game() -> None:
+    """Drop everything carried over between searches (UCI ucinewgame)."""
+    tt.clear()
+    eval_cache.clear()
+    info.clear_heuristics()
+
+def check_limits() -> None:
+    """Called every CHECK_INTERVAL nodes, sets info.stopped once stopped, out of time or out of nodes."""
+    if stop_event.is_set():
+        info.stopped = True
+    elif info.node_limit is not None and info.nodes >= info.node_limit:
+        info.stopped = True
+    elif info.hard_deadline is not None and time.perf_counter() >= info.hard_deadline:
+        info.stopped = True
 
 def quiescence(pos: Position, alpha: int, beta: int) -> int:
     """
     Search captures until the position is quiet.
     """
-    stand_pat = evaluate(pos)
-    if pos.side_to_move == "b":
-        stand_pat = -stand_pat
+    info.nodes += 1
+    if info.nodes % CHECK_INTERVAL == 0:
+        check_limits()
+    if info.stopped:
+        return 0
+
+    # The window lets evaluation skip its slower terms when the score is far outside it
+    stand_pat = evaluate_relative(pos, alpha, beta)
     
     if stand_pat >= beta:
         return beta
@@ -59,14 +246,25 @@ def quiescence(pos: Position, alpha: int, beta: int) -> int:
     
     captures = generate_captures(pos)
     captures = order_moves(pos, captures)  # Order captures too!
+    board = pos.board
     
     for move in captures:
-        if not is_legal(pos, move):
-            continue
-            
-        new_pos = make_move(pos, move)
-        score = -quiescence(new_pos, -beta, -alpha)
+        if not move & PROMO_MASK:
+            victim = 0 if move & FLAG_EP else board[(move >> TO_SHIFT) & 63] % 6
+            victim_value = SEE_VALUES[victim]
+            # Delta pruning: even winning the piece for free leaves us below alpha
+            if stand_pat + victim_value + DELTA_MARGIN <= alpha:
+                continue
+            # Losing captures (e.g. QxP defended by a pawn) are not worth a look
+            if SEE_VALUES[board[move & 63] % 6] > victim_value and see(pos, move) < 0:
+                continue
+        
+        make_move(pos, move)
+        score = -quiescence(pos, -beta, -alpha)
+        unmake_move(pos)
         
+        if info.stopped:
+            return 0
         if score >= beta:
             return beta
         if score > alpha:
@@ -74,71 +272,352 @@ def quiescence(pos: Position, alpha: int, beta: int) -> int:
     
     return alpha
 
-def negamax(pos: Position, depth: int, alpha: int, beta: int, history: set[int]) -> int:
+def stop() -> None:
+    """Abort the running search as soon as it next checks its limits."""
+    stop_event.set()
+    info.stopped = True
+
+def ponderhit(limits: SearchLimits) -> None:
+    """
+    The opponent played the move we were pondering on: start our clock now.
+    limits is what the search was started with. If it has not reached
+    info.reset yet, reset sees ponder cleared and starts the clock itself.
+    """
+    with _clock_lock:
+        limits.ponder = False
+        if info.limits is limits:
+            info.start_clock(time.perf_counter())
+
+def _pv_move(pos: Position, ply: int) -> int:
+    """The previous iteration's PV move at this ply, if we are still walking down that line."""
+    if not info.follow_pv:
+        return NO_MOVE
+    info.follow_pv = False
+    prev_pv = info.prev_pv
+    if ply < len(prev_pv):
+        move = prev_pv[ply]
+        if is_pseudo_legal(pos, move) and is_legal(pos, move):
+            info.follow_pv = True
+            return move
+    return NO_MOVE
+
+def negamax(pos: Position, depth: int, ply: int, alpha: int, beta: int) -> int:
     """
     Negamax search with alpha-beta pruning.
     """
-    pos_hash = hash_position(pos)
-    if pos_hash in history:
+    info.pv_table[ply] = []
+    pos_hash = pos.hash
+    if pos.is_repetition(ply):
         return 0
     
-    if depth == 0:
-        return quiescence(pos, alpha, beta)
+    # Fifty move rule, unless the last move before it was mate
+    if pos.halfmove_clock >= 100 and (not is_in_check(pos) or generate_legal_moves(pos)):
+        return 0
     
-    moves = generate_legal_moves(pos)
+    # Mate distance pruning: a mate found closer to the root already beats anything here
+    alpha = max(alpha, -CHECKMATE_SCORE + ply)
+    beta = min(beta, CHECKMATE_SCORE - ply - 1)
+    if alpha >= beta:
+        return alpha
     
-    if not moves:
-        if is_in_check(pos):
-            return -CHECKMATE_SCORE
+    # Check extension: look one ply further when in check, so a check at
+    # the horizon can't hide a mate or a lost piece
+    in_check = is_in_check(pos)
+    if in_check:
+        depth += 1
+    
+    if depth <= 0 or ply >= MAX_PLY:
+        return quiescence(pos, alpha, beta)
+
+    info.nodes += 1
+    if info.nodes % CHECK_INTERVAL == 0:
+        check_limits()
+    if info.stopped:
         return 0
     
-    # Order moves for better pruning
-    moves = order_moves(pos, moves)
+    # Transposition table cutoff if we already searched this position deep enough
+    tt_move = NO_MOVE
+    entry = tt.probe(pos_hash)
+    if entry is not None:
+        _, tt_depth, tt_score, tt_flag, tt_move, _ = entry
+        tt_score = score_from_tt(tt_score, ply)
+        if tt_depth >= depth and not info.follow_pv:
+            if tt_flag == EXACT:
+                return tt_score
+            if tt_flag == LOWER and tt_score >= beta:
+                return beta
+            if tt_flag == UPPER and tt_score <= alpha:
+                return alpha
     
-    new_history = history | {pos_hash}
+    # Null move pruning: let the opponent move twice. If we are still above
+    # beta with a reduced search, a real move would almost surely be too.
+    # Not in check (passing would be illegal), not right after another null
+    # move, and not with only pawns left where zugzwang makes passing a
+    # real advantage.
+    if (options.null_move
+            and depth >= NULL_MOVE_MIN_DEPTH
+            and not in_check
+            and not info.follow_pv
+            and beta < MATE_BOUND
+            and pos.undo_ply > 0
+            and pos.undo_stack[pos.undo_ply - 1][0] != NO_MOVE
+            and has_non_pawn_material(pos)):
+        reduction = NULL_MOVE_R_DEEP if depth > NULL_MOVE_DEEP_DEPTH else NULL_MOVE_R
+        make_null_move(pos)
+        score = -negamax(pos, max(0, depth - 1 - reduction), ply + 1, -beta, -beta + 1)
+        unmake_null_move(pos)
+        if info.stopped:
+            return 0
+        if score >= beta:
+            return beta
+    
+    # Moves come lazily from the staged picker, the previous PV move beats the TT move
+    pv_move = _pv_move(pos, ply)
+    moves = pick_moves(
+        pos,
+        pv_move if pv_move != NO_MOVE else tt_move,
+        info.killers[ply],
+        info.countermove(pos),
+        info.history[pos.stm],
+    )
+    
+    alpha_orig = alpha
+    best_move = NO_MOVE
+    pv_table = info.pv_table
+    quiets_tried = []
+    legal_moves = 0
+    killers = info.killers[ply]
+    history_table = info.history[pos.stm]
     
     for move in moves:
-        new_pos = make_move(pos, move)
-        score = -negamax(new_pos, depth - 1, -beta, -alpha, new_history)
+        legal_moves += 1
+        make_move(pos, move)
+        
+        if legal_moves == 1:
+            score = -negamax(pos, depth - 1, ply + 1, -beta, -alpha)
+        else:
+            # Late move reductions: quiet moves ordered late are unlikely to be
+            # best, search them shallower first. Less so with a good history.
+            reduction = 0
+            if (options.lmr
+                    and depth >= LMR_MIN_DEPTH
+                    and legal_moves > LMR_FULL_MOVES
+                    and not in_check
+                    and not move & NOISY_MASK
+                    and move != killers[0]
+                    and move != killers[1]
+                    and not is_in_check(pos)):
+                reduction = 1 if legal_moves <= LMR_LATE_MOVES else 2
+                if history_table[move & 0xFFF] > HISTORY_MAX // 2:
+                    reduction -= 1
+                reduction = min(reduction, depth - 2)
+            
+            # PVS: prove this move is no better than alpha with a null window
+            window_beta = alpha + 1 if options.pvs else beta
+            score = -negamax(pos, depth - 1 - reduction, ply + 1, -window_beta, -alpha)
+            if reduction and score > alpha:
+                score = -negamax(pos, depth - 1, ply + 1, -window_beta, -alpha)
+            if window_beta != beta and alpha < score < beta:
+                score = -negamax(pos, depth - 1, ply + 1, -beta, -alpha)
+        
+        unmake_move(pos)
         
+        # Aborted: the score is meaningless, don't let it reach the TT
+        if info.stopped:
+            return 0
         if score >= beta:
+            if not move & NOISY_MASK:
+                info.update_quiet_cutoff(pos, move, ply, depth, quiets_tried)
+            tt.store(pos_hash, depth, score_to_tt(beta, ply), LOWER, move)
+            # Mate distance pruning caps beta, so a mating move lands here
+            # rather than raising alpha. Keep it in the PV.
+            pv_table[ply] = [move] + pv_table[ply + 1]
             return beta
+        if not move & NOISY_MASK:
+            quiets_tried.append(move)
         if score > alpha:
             alpha = score
+            best_move = move
+            pv_table[ply] = [move] + pv_table[ply + 1]
+    
+    if legal_moves == 0:
+        if in_check:
+            # Mated here: the further from the root, the better for us
+            return -CHECKMATE_SCORE + ply
+        return 0
+    
+    if alpha > alpha_orig:
+        tt.store(pos_hash, depth, score_to_tt(alpha, ply), EXACT, best_move)
+    else:
+        tt.store(pos_hash, depth, score_to_tt(alpha, ply), UPPER, NO_MOVE)
     
     return alpha
 
 
-def search(pos: Position, depth: int, history: set[int] | None = None) -> tuple[Move | None, int]:
+def search_root(pos: Position, moves: list[int], depth: int, alpha: int, beta: int) -> int:
     """
-    Search for the best move.
+    One iteration at the root. The best line ends up in info.pv_table[0].
+    moves must already be ordered.
     """
-    if history is None:
-        history = set()
+    info.pv_table[0] = []
+    pos_hash = pos.hash
+    alpha_orig = alpha
+    best_move = NO_MOVE
+    pv_table = info.pv_table
+
+    for i, move in enumerate(moves):
+        make_move(pos, move)
+        if i == 0 or not options.pvs:
+            score = -negamax(pos, depth - 1, 1, -beta, -alpha)
+        else:
+            score = -negamax(pos, depth - 1, 1, -alpha - 1, -alpha)
+            if alpha < score < beta:
+                score = -negamax(pos, depth - 1, 1, -beta, -alpha)
+        unmake_move(pos)
+        # Only the first root move is on the previous PV
+        info.follow_pv = False
+
+        if info.stopped:
+            return 0
+
+        if score >= beta:
+            pv_table[0] = [move] + pv_table[1]
+            tt.store(pos_hash, depth, beta, LOWER, move)
+            return beta
+        if score > alpha:
+            alpha = score
+            best_move = move
+            pv_table[0] = [move] + pv_table[1]
+
+    if alpha > alpha_orig:
+        tt.store(pos_hash, depth, alpha, EXACT, best_move)
+    return alpha
+
+
+def format_score(score: int) -> str:
+    """UCI score: 'cp X', or 'mate N' in moves (negative when we are getting mated)."""
+    if score >= MATE_BOUND:
+        return f"mate {(CHECKMATE_SCORE - score + 1) // 2}"
+    if score <= -MATE_BOUND:
+        return f"mate -{(CHECKMATE_SCORE + score) // 2}"
+    return f"cp {score}"
+
+
+def print_info(depth: int, score: int, pv: list[int]) -> None:
+    elapsed = time.perf_counter() - info.start_time
+    ms = int(elapsed * 1000)
+    nps = int(info.nodes / elapsed) if elapsed > 0 else 0
+    line = f"info depth {depth} score {format_score(score)} nodes {info.nodes} nps {nps} hashfull {tt.hashfull()} time {ms}"
+    if pv:
+        line += " pv " + " ".join(move_to_uci(m) for m in pv)
+    send(line)
+
+
+def print_eval_cache_stats() -> None:
+    hits = eval_cache.hits
+    probes = hits + eval_cache.misses
+    rate = hits * 100 // probes if probes else 0
+    send(f"info string evalcache hits {hits} misses {eval_cache.misses} hitrate {rate}%")
+
+
+def search(
+    pos: Position,
+    depth: int | None = None,
+    limits: SearchLimits | None = None,
+) -> tuple[Move | None, int]:
+    """
+    Iterative deepening search until depth, or until the limits run out.
+    Returns the public Move wrapper (or None) and the score of the last completed iteration.
+    """
+    if limits is None:
+        limits = SearchLimits()
     
-    best_move = None
-    alpha = -INFINITY
-    beta = INFINITY
+    # An explicit depth wins, otherwise search until a limit stops us
+    if depth is None:
+        depth = limits.depth
+    if depth is None:
+        unlimited = limits.infinite or limits.nodes is not None or limits.is_timed()
+        depth = MAX_PLY - 1 if unlimited else DEFAULT_DEPTH
     
     moves = generate_legal_moves(pos)
     
     if not moves:
         return None, 0
     
-    # Order moves
-    moves = order_moves(pos, moves)
+    tt.new_search()
+    eval_cache.reset_stats()
+    info.reset(limits, pos.stm)
     
-    pos_hash = hash_position(pos)
-    new_history = history | {pos_hash}
+    # Order moves, trying the best move from a previous search first
+    entry = tt.probe(pos.hash)
+    moves = order_moves(pos, moves, entry[4] if entry is not None else NO_MOVE)
     
-    for move in moves:
-        new_pos = make_move(pos, move)
-        score = -negamax(new_pos, depth - 1, -beta, -alpha, new_history)
-        
-        if score > alpha:
-            alpha = score
-            best_move = move
+    # Something legal to play even if the first iteration gets cut off
+    best_move = moves[0]
+    score = 0
     
-    print(f"info depth {depth} score cp {alpha}")
+    for d in range(1, depth + 1):
+        # Aspiration window around the last score, skipped for the first
+        # iterations (scores still jump around) and for mate scores
+        if d >= 3 and abs(score) < MATE_BOUND:
+            delta = ASPIRATION_WINDOW
+            alpha = score - delta
+            beta = score + delta
+        else:
+            delta = INFINITY
+            alpha = -INFINITY
+            beta = INFINITY
+        
+        fails = 0
+        while True:
+            info.follow_pv = True
+            result = search_root(pos, moves, d, alpha, beta)
+            if info.stopped:
+                break
+            
+            if result <= alpha and alpha > -INFINITY:
+                # Fail low: nothing reached alpha, widen downwards, or all the
+                # way once we've failed too often or see a mate
+                fails += 1
+                delta *= 2
+                if fails >= ASPIRATION_MAX_FAILS or result <= -MATE_BOUND:
+                    alpha = -INFINITY
+                else:
+                    alpha = max(score - delta, -INFINITY)
+            elif result >= beta and beta < INFINITY:
+                # Fail high: widen upwards, keep the move that failed high at the front
+                fails += 1
+                delta *= 2
+                if fails >= ASPIRATION_MAX_FAILS or result >= MATE_BOUND:
+                    beta = INFINITY
+                else:
+                    beta = min(score + delta, INFINITY)
+                fail_high_move = info.pv_table[0][0]
+                moves.remove(fail_high_move)
+                moves.insert(0, fail_high_move)
+            else:
+                break
+        
+        # An aborted iteration is thrown away
+        if info.stopped:
+            break
+        
+        score = result
+        pv = info.pv_table[0]
+        info.prev_pv = pv
+        best_move = pv[0]
+        
+        # Search the best move first next iteration
+        moves.remove(best_move)
+        moves.insert(0, best_move)
+        
+        print_info(d, score, pv)
+        
+        # Not worth starting an iteration we probably can't finish
+        if info.soft_deadline is not None and time.perf_counter() >= info.soft_deadline:
+            break
+        if info.node_limit is not None and info.nodes >= info.node_limit:
+            break
     
-    return best_move, alpha
\ No newline at end of file
+    print_eval_cache_stats()
+    return Move.from_int(best_move), score
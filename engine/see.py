@@ -0,0 +1,86 @@
+# Static exchange evaluation
+#
+# Plays out every capture on one square, each side always recapturing with its
+# least valuable attacker, and returns what the first capture wins or loses
+# in centipawns. Pins are ignored. Sliders hidden behind a capturing piece
+# (x-rays) join in once the piece in front of them has moved.
+
+from .position import Position, WHITE
+from .attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS
+from .sliders import rook_attacks, bishop_attacks
+from .move import TO_SHIFT, PROMO_SHIFT, FLAG_EP
+
+# Values by piece type (P N B R Q K), the king is worth more than anything it could win
+SEE_VALUES = [100, 320, 330, 500, 900, 20000]
+
+
+def see(pos: Position, move: int) -> int:
+    """Material balance for the side to move after all exchanges on the target square."""
+    pieces = pos.pieces
+    from_sq = move & 63
+    to_sq = (move >> TO_SHIFT) & 63
+    occ = pos.all_occ ^ (1 << from_sq)
+
+    if move & FLAG_EP:
+        captured = SEE_VALUES[0]
+        # The captured pawn is behind the target square
+        occ ^= 1 << (to_sq - 8 if pos.stm == WHITE else to_sq + 8)
+    else:
+        victim = pos.board[to_sq]
+        captured = 0 if victim is None else SEE_VALUES[victim % 6]
+
+    # Value of the piece that now stands on the target square
+    promo = (move >> PROMO_SHIFT) & 7
+    if promo:
+        captured += SEE_VALUES[promo] - SEE_VALUES[0]
+        on_square = SEE_VALUES[promo]
+    else:
+        on_square = SEE_VALUES[pos.board[from_sq] % 6]
+
+    bishops = pieces[2] | pieces[4] | pieces[8] | pieces[10]
+    rooks = pieces[3] | pieces[4] | pieces[9] | pieces[10]
+    attackers = (
+        (PAWN_ATTACKS[1][to_sq] & pieces[0])
+        | (PAWN_ATTACKS[0][to_sq] & pieces[6])
+        | (KNIGHT_ATTACKS[to_sq] & (pieces[1] | pieces[7]))
+        | (KING_ATTACKS[to_sq] & (pieces[5] | pieces[11]))
+        | (bishop_attacks(to_sq, occ) & bishops)
+        | (rook_attacks(to_sq, occ) & rooks)
+    ) & occ
+
+    # gains[d] = material won by the side making capture d, assuming it stops there
+    gains = [captured]
+    side = 6 if pos.stm == WHITE else 0   # base index of the side to recapture
+
+    while True:
+        side_attackers = attackers & (pos.black_occ if side else pos.white_occ)
+        if not side_attackers:
+            break
+
+        # Least valuable attacker
+        for kind in range(6):
+            bb = pieces[side + kind] & side_attackers
+            if bb:
+                break
+
+        gains.append(on_square - gains[-1])
+        # Neither side can gain by going on, stop early
+        if max(-gains[-2], gains[-1]) < 0:
+            break
+
+        occ ^= bb & -bb
+        on_square = SEE_VALUES[kind]
+
+        # Uncover x-rays behind the piece that just captured
+        if kind == 0 or kind == 2 or kind == 4:
+            attackers |= bishop_attacks(to_sq, occ) & bishops
+        if kind == 3 or kind == 4:
+            attackers |= rook_attacks(to_sq, occ) & rooks
+        attackers &= occ
+
+        side ^= 6
+
+    # Each side may stop capturing when that is better for it
+    for d in range(len(gains) - 1, 0, -1):
+        gains[d - 1] = -max(-gains[d - 1], gains[d])
+    return gains[0]
@@ -1,6 +1,12 @@
 # Sliding piece attack generation (rooks, bishops, queens)
-
-from .bitboard import bit
+#
+# Every ray (direction from a square to the edge of the board) is precomputed
+# at import. To get attacks for an occupancy we take the ray, find the first
+# blocker on it and cut off everything behind the blocker by XORing with the
+# blocker's own ray in the same direction.
+#
+# For directions that increase the square index the first blocker is the lowest
+# set bit, for directions that decrease it the first blocker is the highest set bit.
 
 MASK64 = 0xFFFFFFFFFFFFFFFF
 
@@ -23,57 +29,139 @@ def rank_of(sq: int) -> int:
     return sq // 8
 
 
-def ray_attacks(sq: int, direction: int, occupancy: int) -> int:
+def _ray_walk(sq: int, direction: int, occupancy: int = 0) -> int:
+    """Step square by square along a direction. Only used to build the tables."""
     attacks = 0
     current_sq = sq
     current_file = file_of(sq)
-    
+
     while True:
         # Step in direction
         current_sq += direction
         new_file = file_of(current_sq)
-        
+
         # Check if we've left the board (top or bottom)
         if current_sq < 0 or current_sq > 63:
             break
-        
+
         # Check if we've wrapped around (east/west movement)
-        # If we moved east (+1), file should increase by 1
-        # If we moved west (-1), file should decrease by 1
         # If file changed by more than 1, we wrapped
-        file_diff = abs(new_file - current_file)
-        if file_diff > 1:
+        if abs(new_file - current_file) > 1:
             break
-        
+
         # This square is attackable
-        attacks |= bit(current_sq)
-        
+        attacks |= 1 << current_sq
+
         # If there's a piece here, we stop (can capture but not go through)
-        if occupancy & bit(current_sq):
+        if occupancy & (1 << current_sq):
             break
-        
+
         current_file = new_file
-    
+
     return attacks
 
 
+# RAYS[direction][sq] = every square from sq to the edge of the board, sq excluded
+RAYS = {
+    direction: [_ray_walk(sq, direction) for sq in range(64)]
+    for direction in (NORTH, SOUTH, EAST, WEST, NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST)
+}
+
+NORTH_RAYS = RAYS[NORTH]
+SOUTH_RAYS = RAYS[SOUTH]
+EAST_RAYS = RAYS[EAST]
+WEST_RAYS = RAYS[WEST]
+NORTH_EAST_RAYS = RAYS[NORTH_EAST]
+NORTH_WEST_RAYS = RAYS[NORTH_WEST]
+SOUTH_EAST_RAYS = RAYS[SOUTH_EAST]
+SOUTH_WEST_RAYS = RAYS[SOUTH_WEST]
+
+
+def _build_between() -> list[list[int]]:
+    between = [[0] * 64 for _ in range(64)]
+    for a in range(64):
+        for rays in RAYS.values():
+            ray = rays[a]
+            t = ray
+            while t:
+                b = (t & -t).bit_length() - 1
+                t &= t - 1
+                # Squares from a towards b, minus everything from b onwards
+                between[a][b] = ray & ~rays[b] & ~(1 << b)
+    return between
+
+# BETWEEN[a][b] = squares strictly between a and b if they share a rank, file or diagonal, else 0
+BETWEEN = _build_between()
+
+
+def ray_attacks(sq: int, direction: int, occupancy: int) -> int:
+    rays = RAYS[direction]
+    ray = rays[sq]
+    blockers = ray & occupancy
+    if blockers:
+        if direction > 0:
+            first = (blockers & -blockers).bit_length() - 1
+        else:
+            first = blockers.bit_length() - 1
+        ray ^= rays[first]
+    return ray
+
+
 def rook_attacks(sq: int, occupancy: int) -> int:
-    attacks = 0
-    attacks |= ray_attacks(sq, NORTH, occupancy)
-    attacks |= ray_attacks(sq, SOUTH, occupancy)
-    attacks |= ray_attacks(sq, EAST, occupancy)
-    attacks |= ray_attacks(sq, WEST, occupancy)
+    # Written out by hand rather than calling ray_attacks four times,
+    # this is one of the hottest functions in the engine
+    attacks = NORTH_RAYS[sq]
+    blockers = attacks & occupancy
+    if blockers:
+        attacks ^= NORTH_RAYS[(blockers & -blockers).bit_length() - 1]
+
+    ray = EAST_RAYS[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= EAST_RAYS[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+
+    ray = SOUTH_RAYS[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= SOUTH_RAYS[blockers.bit_length() - 1]
+    attacks |= ray
+
+    ray = WEST_RAYS[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= WEST_RAYS[blockers.bit_length() - 1]
+    attacks |= ray
+
     return attacks
 
 
 def bishop_attacks(sq: int, occupancy: int) -> int:
-    attacks = 0
-    attacks |= ray_attacks(sq, NORTH_EAST, occupancy)
-    attacks |= ray_attacks(sq, NORTH_WEST, occupancy)
-    attacks |= ray_attacks(sq, SOUTH_EAST, occupancy)
-    attacks |= ray_attacks(sq, SOUTH_WEST, occupancy)
+    attacks = NORTH_EAST_RAYS[sq]
+    blockers = attacks & occupancy
+    if blockers:
+        attacks ^= NORTH_EAST_RAYS[(blockers & -blockers).bit_length() - 1]
+
+    ray = NORTH_WEST_RAYS[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= NORTH_WEST_RAYS[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+
+    ray = SOUTH_EAST_RAYS[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= SOUTH_EAST_RAYS[blockers.bit_length() - 1]
+    attacks |= ray
+
+    ray = SOUTH_WEST_RAYS[sq]
+    blockers = ray & occupancy
+    if blockers:
+        ray ^= SOUTH_WEST_RAYS[blockers.bit_length() - 1]
+    attacks |= ray
+
     return attacks
 
 
 def queen_attacks(sq: int, occupancy: int) -> int:
-    return rook_attacks(sq, occupancy) | bishop_attacks(sq, occupancy)
\ No newline at end of file
+    return rook_attacks(sq, occupancy) | bishop_attacks(sq, occupancy)
@@ -0,0 +1,70 @@
+# Search limits from the UCI go command and the per-move time budget
+
+from dataclasses import dataclass
+
+from .position import WHITE
+
+# Time kept back on every move for GUI and process latency (ms)
+MOVE_OVERHEAD_MS = 50
+
+# Moves we plan for when the GUI doesn't send movestogo
+DEFAULT_MOVES_TO_GO = 30
+
+# Never plan for more moves than this, even if movestogo says so
+MAX_MOVES_TO_GO = 50
+
+# The hard budget may run this many times over the soft one, e.g. to finish
+# an iteration that changed its mind about the best move
+HARD_LIMIT_FACTOR = 4
+
+
+@dataclass(slots=True)
+class SearchLimits:
+    """Everything 'go' can tell us. None means not given."""
+    depth: int | None = None
+    nodes: int | None = None
+    movetime: int | None = None     # ms
+    wtime: int | None = None        # ms
+    btime: int | None = None        # ms
+    winc: int = 0                   # ms
+    binc: int = 0                   # ms
+    movestogo: int | None = None
+    infinite: bool = False
+    ponder: bool = False            # Thinking on the opponent's time until ponderhit
+
+    def is_timed(self) -> bool:
+        return self.movetime is not None or self.wtime is not None or self.btime is not None
+
+
+def allocate_time(limits: SearchLimits, stm: int) -> tuple[int | None, int | None]:
+    """
+    Soft and hard budget in ms for this move, None if the search is not timed.
+    The soft budget decides whether to start another iteration, the hard budget
+    aborts an iteration in progress.
+    """
+    if limits.infinite or limits.ponder:
+        return None, None
+
+    if limits.movetime is not None:
+        budget = max(1, limits.movetime - MOVE_OVERHEAD_MS)
+        return budget, budget
+
+    time_left = limits.wtime if stm == WHITE else limits.btime
+    if time_left is None:
+        return None, None
+    inc = limits.winc if stm == WHITE else limits.binc
+
+    # Whatever we use must leave the overhead on the clock
+    available = max(1, time_left - MOVE_OVERHEAD_MS)
+
+    moves_to_go = limits.movestogo or DEFAULT_MOVES_TO_GO
+    moves_to_go = max(1, min(moves_to_go, MAX_MOVES_TO_GO))
+
+    soft = available // moves_to_go + inc * 3 // 4
+    hard = soft * HARD_LIMIT_FACTOR
+
+    # Never bet more than a third of the clock on one move (all of it on the last move before the control)
+    cap = available if moves_to_go == 1 else available // 3
+    soft = max(1, min(soft, cap))
+    hard = max(1, min(hard, cap))
+    return soft, hard
@@ -0,0 +1,113 @@
+# Transposition table keyed on the Zobrist hash
+
+import struct
+import sys
+
+from .move import NO_MOVE
+
+# Bound types for stored scores
+EXACT = 0   # Score is the true minimax value
+LOWER = 1   # Search failed high, true value is >= score
+UPPER = 2   # Search failed low, true value is <= score
+
+DEFAULT_HASH_MB = 16
+MIN_HASH_MB = 1
+MAX_HASH_MB = 1024
+
+def _entry_bytes() -> int:
+    """
+    Measured cost of one full entry: the list slot, the 6-field tuple, and the
+    ints that don't come from the small int cache (key, score, move). Depth,
+    flag and generation are small ints shared by every entry.
+    """
+    key = (1 << 64) - 1
+    score = -12345
+    move = 0xFFFFF
+    entry = (key, 1, score, EXACT, move, 1)
+    return (struct.calcsize("P") + sys.getsizeof(entry)
+            + sys.getsizeof(key) + sys.getsizeof(score) + sys.getsizeof(move))
+
+# Used to turn megabytes into a slot count
+ENTRY_BYTES = _entry_bytes()
+
+# Each bucket holds two entries:
+#   slot 0 - depth-preferred, only replaced by deeper (or newer) searches
+#   slot 1 - always-replace, takes whatever did not fit in slot 0
+BUCKET_SIZE = 2
+
+# Entry layout: (key, depth, score, flag, move, generation)
+# move is a packed move int, NO_MOVE if there is none
+TTEntry = tuple[int, int, int, int, int, int]
+
+
+class TranspositionTable:
+    def __init__(self, size_mb: int = DEFAULT_HASH_MB):
+        self.resize(size_mb)
+
+    def resize(self, size_mb: int) -> None:
+        """Reallocate the table to fit in roughly size_mb megabytes. Clears all entries."""
+        size_mb = max(MIN_HASH_MB, min(MAX_HASH_MB, size_mb))
+        max_buckets = (size_mb * 1024 * 1024) // (ENTRY_BYTES * BUCKET_SIZE)
+
+        # Round down to a power of two so we can index with a mask instead of %
+        num_buckets = 1
+        while num_buckets * 2 <= max_buckets:
+            num_buckets *= 2
+
+        self.size_mb = size_mb
+        self.num_buckets = num_buckets
+        self.mask = num_buckets - 1
+        self.clear()
+
+    def clear(self) -> None:
+        self.table: list[TTEntry | None] = [None] * (self.num_buckets * BUCKET_SIZE)
+        self.generation = 0
+
+    def new_search(self) -> None:
+        """Called once per search so entries from older searches can be replaced first."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key: int) -> TTEntry | None:
+        idx = (key & self.mask) * BUCKET_SIZE
+        table = self.table
+
+        entry = table[idx]
+        if entry is not None and entry[0] == key:
+            return entry
+
+        entry = table[idx + 1]
+        if entry is not None and entry[0] == key:
+            return entry
+
+        return None
+
+    def store(self, key: int, depth: int, score: int, flag: int, move: int) -> None:
+        idx = (key & self.mask) * BUCKET_SIZE
+        table = self.table
+        deep = table[idx]
+
+        # Keep the old best move if this search didn't produce one (e.g. fail low)
+        if move == NO_MOVE:
+            if deep is not None and deep[0] == key:
+                move = deep[4]
+            else:
+                old = table[idx + 1]
+                if old is not None and old[0] == key:
+                    move = old[4]
+
+        entry = (key, depth, score, flag, move, self.generation)
+
+        # Depth-preferred slot: take it if empty, same position, stale, or we searched deeper
+        if (deep is None
+                or deep[0] == key
+                or deep[5] != self.generation
+                or depth >= deep[1]):
+            table[idx] = entry
+        else:
+            table[idx + 1] = entry
+
+    def hashfull(self) -> int:
+        """Permille of the first 1000 slots used in the current search (for UCI info hashfull)."""
+        sample = self.table[:1000]
+        used = sum(1 for e in sample if e is not None and e[5] == self.generation)
+        return used * 1000 // len(sample)
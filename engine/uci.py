@@ -1,24 +1,26 @@
-import sys
+import threading
 from .fen import parse_fen
 from .position import Position
-from .search import search
+from .search import search, tt, info, options, new_game, stop_event, stop, ponderhit
+from .move import move_to_uci
+from .timeman import SearchLimits
+from .perft import run_perft
+from .tt import DEFAULT_HASH_MB, MIN_HASH_MB, MAX_HASH_MB
 from .makeunmake import make_move
-from .move import Move
-from .bitboard import uci_to_sq
-from .zobrist import hash_position
+from .movegen import find_move
+from .output import send
 
-def parse_move(uci_str: str) -> Move:
-    """Convert UCI string like 'e2e4' or 'e7e8q' to a Move object."""
-    from_sq = uci_to_sq(uci_str[0:2])
-    to_sq = uci_to_sq(uci_str[2:4])
-    promo = uci_str[4] if len(uci_str) == 5 else None
-    return Move(from_sq, to_sq, promo)
+def parse_move(pos: Position, uci_str: str) -> int:
+    """Convert UCI string like 'e2e4' or 'e7e8q' to a packed move in this position."""
+    move = find_move(pos, uci_str)
+    if move is None:
+        raise ValueError(f"Illegal move: {uci_str}")
+    return move
 
 
 def parse_position(tokens: list[str]) -> Position:
     """Parse 'position startpos moves e2e4 e7e5' or 'position fen <fen> moves ...'"""
     idx = 1
-    history = set()
     
     if tokens[idx] == "startpos":
         pos = parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
@@ -30,40 +32,130 @@ def parse_position(tokens: list[str]) -> Position:
         pos = parse_fen(fen)
         idx = 8
 
-    # Add starting position to history
-    history.add(hash_position(pos))
-    
     # Apply moves if present
     if idx < len(tokens) and tokens[idx] == "moves":
         idx += 1
         while idx < len(tokens):
-            move = parse_move(tokens[idx])
-            pos = make_move(pos, move)
-            history.add(hash_position(pos))  # Track each position
+            move = parse_move(pos, tokens[idx])
+            # Made in place, so the game's hashes stay on the undo stack for repetition checks
+            make_move(pos, move)
             idx += 1
     
-    return pos, history
+    return pos
+
+# go parameters that take an integer argument, all stored on SearchLimits under the same name
+GO_INT_PARAMS = ("depth", "nodes", "movetime", "wtime", "btime", "winc", "binc", "movestogo")
 
-def parse_go(tokens: list[str]) -> int:
-    """Parse 'go depth 5' and return the depth. Default to 4 if not specified."""
-    depth = 5  # Default depth
+def parse_go(tokens: list[str]) -> SearchLimits:
+    """Parse 'go [depth N] [wtime N btime N winc N binc N movestogo N] [movetime N] [nodes N] [infinite] [ponder]'."""
+    limits = SearchLimits()
     
-    for i, token in enumerate(tokens):
-        if token == "depth" and i + 1 < len(tokens):
-            depth = int(tokens[i + 1])
-            break
+    i = 1
+    while i < len(tokens):
+        token = tokens[i]
+        if token in GO_INT_PARAMS and i + 1 < len(tokens):
+            # Some GUIs send negative clock values when flagging
+            setattr(limits, token, max(0, int(tokens[i + 1])))
+            i += 2
+        else:
+            if token == "infinite":
+                limits.infinite = True
+            elif token == "ponder":
+                limits.ponder = True
+            i += 1
     
-    return depth
+    return limits
+
+# UCI check options that switch search features on and off, name -> SearchOptions field
+CHECK_OPTIONS = {"PVS": "pvs", "NullMove": "null_move", "LMR": "lmr"}
+# Option names are case insensitive
+CHECK_OPTION_FIELDS = {name.lower(): field for name, field in CHECK_OPTIONS.items()}
+
+def parse_setoption(tokens: list[str]) -> tuple[str, str | None]:
+    """Parse 'setoption name <id> [value <x>]'. Names and values may contain spaces."""
+    name_parts = []
+    value_parts = []
+    current = None
+
+    for token in tokens[1:]:
+        if token == "name":
+            current = name_parts
+        elif token == "value":
+            current = value_parts
+        elif current is not None:
+            current.append(token)
+
+    value = " ".join(value_parts) if value_parts else None
+    return " ".join(name_parts), value
+
+class SearchWorker:
+    """
+    Runs one search at a time on a background thread so the UCI loop keeps
+    reading input. stop/ponderhit/quit are forwarded to the running search.
+    """
+
+    def __init__(self):
+        self.thread: threading.Thread | None = None
+        # Limits of the running search, ponderhit changes this object directly
+        self.limits: SearchLimits | None = None
+        # Set by stop or ponderhit. In infinite and ponder mode bestmove
+        # must wait for it even if the search finishes on its own.
+        self.release = threading.Event()
+
+    def is_searching(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, pos: Position, limits: SearchLimits) -> None:
+        self.stop()
+        stop_event.clear()
+        self.release.clear()
+        self.limits = limits
+        # The search makes and unmakes moves in place, give it its own copy
+        self.thread = threading.Thread(
+            target=self._run, args=(pos.copy(), limits), daemon=True,
+        )
+        self.thread.start()
+
+    def _run(self, pos: Position, limits: SearchLimits) -> None:
+        best_move, _ = search(pos, limits=limits)
+
+        if limits.infinite or limits.ponder:
+            self.release.wait()
+
+        if best_move is None:
+            send("bestmove 0000")
+            return
+        pv = info.prev_pv
+        if len(pv) > 1:
+            send(f"bestmove {best_move.to_uci()} ponder {move_to_uci(pv[1])}")
+        else:
+            send(f"bestmove {best_move.to_uci()}")
+
+    def stop(self) -> None:
+        """Abort the search (if any) and wait until its bestmove is out."""
+        if self.is_searching():
+            stop()
+            self.release.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def ponderhit(self) -> None:
+        if self.is_searching():
+            ponderhit(self.limits)
+            self.release.set()
+
 
 def uci_loop():
     """Main UCI protocol loop."""
     pos = None
-    history = set()
+    worker = SearchWorker()
     
     while True:
         try:
             line = input().strip()
         except EOFError:
+            worker.stop()
             break
         
         if not line:
@@ -73,31 +165,71 @@ def uci_loop():
         cmd = tokens[0]
         
         if cmd == "uci":
-            print("id name CB-PyChess")
-            print("id author ConorBowles")
-            print("uciok")
+            send("id name CB-PyChess")
+            send("id author ConorBowles")
+            send(f"option name Hash type spin default {DEFAULT_HASH_MB} min {MIN_HASH_MB} max {MAX_HASH_MB}")
+            send("option name Ponder type check default false")
+            for name, attr in CHECK_OPTIONS.items():
+                default = "true" if getattr(options, attr) else "false"
+                send(f"option name {name} type check default {default}")
+            send("uciok")
         
         elif cmd == "isready":
-            print("readyok")
+            # Answered straight away, even while searching
+            send("readyok")
+        
+        elif cmd == "stop":
+            worker.stop()
+        
+        elif cmd == "ponderhit":
+            worker.ponderhit()
         
         elif cmd == "ucinewgame":
+            worker.stop()
             pos = None
-            history = set()  # Clear history for new game
+            new_game()
+        
+        elif cmd == "setoption":
+            name, value = parse_setoption(tokens)
+            if name.lower() == "hash" and value is not None:
+                try:
+                    size_mb = int(value)
+                except ValueError:
+                    send(f"info string invalid Hash value: {value}")
+                    continue
+                worker.stop()
+                tt.resize(size_mb)
+            elif name.lower() in CHECK_OPTION_FIELDS and value is not None:
+                worker.stop()
+                setattr(options, CHECK_OPTION_FIELDS[name.lower()], value.lower() == "true")
         
         elif cmd == "position":
-            pos, history = parse_position(tokens)
+            worker.stop()
+            # A bad FEN or illegal move leaves the previous position in place
+            try:
+                pos = parse_position(tokens)
+            except ValueError as e:
+                send(f"info string {e}")
+        
+        elif cmd == "go" and len(tokens) > 2 and tokens[1] == "perft":
+            try:
+                depth = int(tokens[2])
+            except ValueError:
+                send(f"info string invalid perft depth: {tokens[2]}")
+                continue
+            if pos:
+                worker.stop()
+                run_perft(pos, depth)
         
         elif cmd == "go":
-            depth = parse_go(tokens)
+            try:
+                limits = parse_go(tokens)
+            except ValueError as e:
+                send(f"info string {e}")
+                continue
             if pos:
-                best_move, score = search(pos, depth, history)
-                if best_move:
-                    print(f"bestmove {best_move.to_uci()}")
-                else:
-                    print("bestmove 0000")
+                worker.start(pos, limits)
         
         elif cmd == "quit":
+            worker.stop()
             break
-        
-        # Flush output so GUI receives it immediately
-        sys.stdout.flush()
\ No newline at end of file
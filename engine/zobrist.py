@@ -1,5 +1,8 @@
 import random
 
+from .position import BLACK, castling_from_str
+from .bitboard import squares
+
 # Fix the seed so hashes are consistent across runs
 random.seed(1234567)
 
@@ -17,13 +20,8 @@ EP_KEYS = [random.getrandbits(64) for _ in range(9)]
 
 
 def castling_to_index(castling: str) -> int:
-    """Convert castling string to index 0-15."""
-    idx = 0
-    if 'K' in castling: idx |= 1
-    if 'Q' in castling: idx |= 2
-    if 'k' in castling: idx |= 4
-    if 'q' in castling: idx |= 8
-    return idx
+    """Convert castling string to index 0-15 (the same as Position.castling_rights)."""
+    return castling_from_str(castling)
 
 
 def hash_position(pos) -> int:
@@ -32,18 +30,15 @@ def hash_position(pos) -> int:
     
     # Hash pieces
     for piece_idx in range(12):
-        bb = pos.pieces[piece_idx]
-        while bb:
-            sq = (bb & -bb).bit_length() - 1
-            bb &= bb - 1
+        for sq in squares(pos.pieces[piece_idx]):
             h ^= PIECE_KEYS[piece_idx][sq]
     
     # Hash side to move
-    if pos.side_to_move == "b":
+    if pos.stm == BLACK:
         h ^= SIDE_KEY
     
     # Hash castling rights
-    h ^= CASTLING_KEYS[castling_to_index(pos.castling)]
+    h ^= CASTLING_KEYS[pos.castling_rights]
     
     # Hash en passant
     if pos.ep_square is not None:
@@ -52,4 +47,12 @@ def hash_position(pos) -> int:
     else:
         h ^= EP_KEYS[8]  # No ep
     
-    return h
\ No newline at end of file
+    return h
+
+def hash_pawns(pos) -> int:
+    """Zobrist key of the pawns alone, for the pawn hash table."""
+    h = 0
+    for piece_idx in (0, 6):
+        for sq in squares(pos.pieces[piece_idx]):
+            h ^= PIECE_KEYS[piece_idx][sq]
+    return h
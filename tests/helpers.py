@@ -0,0 +1,19 @@
+from engine.fen import parse_fen
+from engine.makeunmake import make_move
+from engine.movegen import generate_legal_moves
+
+
+def random_walk(fen, plies, rng):
+    """
+    Play up to plies random legal moves from fen. Yields the position before
+    every move and once more at the end, so tests only assert their own invariant.
+    The same Position object is yielded each time, moves are made in place.
+    """
+    pos = parse_fen(fen)
+    yield pos
+    for _ in range(plies):
+        moves = generate_legal_moves(pos)
+        if not moves:
+            return
+        make_move(pos, rng.choice(moves))
+        yield pos
@@ -0,0 +1,25 @@
+from engine.bitboard import SQUARE_BB, popcount, lsb, msb, squares, bit
+
+
+def test_square_masks():
+    assert len(SQUARE_BB) == 64
+    assert all(SQUARE_BB[sq] == bit(sq) for sq in range(64))
+
+
+def test_popcount():
+    assert popcount(0) == 0
+    assert popcount(0xFFFFFFFFFFFFFFFF) == 64
+    assert popcount(0x8100000000000081) == 4
+
+
+def test_lsb_and_msb():
+    bb = SQUARE_BB[3] | SQUARE_BB[40]
+    assert lsb(bb) == 3
+    assert msb(bb) == 40
+    assert lsb(SQUARE_BB[63]) == msb(SQUARE_BB[63]) == 63
+
+
+def test_squares_yields_set_bits_in_order():
+    assert list(squares(0)) == []
+    assert list(squares(0x8100000000000081)) == [0, 7, 56, 63]
+    assert list(squares(0xFFFFFFFFFFFFFFFF)) == list(range(64))
@@ -0,0 +1,47 @@
+import random
+
+from engine.fen import parse_fen
+from engine.move import move_to_uci, move_promo, FLAG_CAPTURE
+from engine.movegen import generate_captures, generate_quiets, generate_legal_moves
+from engine.perft import PERFT_POSITIONS
+from helpers import random_walk
+
+
+def test_captures_only_hit_enemy_pieces():
+    pos = parse_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    captures = sorted(move_to_uci(m) for m in generate_captures(pos))
+    assert captures == sorted([
+        "d5e6", "e5d7", "e5f7", "e5g6", "e2a6", "f3f6", "f3h3", "g2h3",
+    ])
+
+
+def test_captures_include_en_passant_and_queen_promotion():
+    pos = parse_fen("4k3/1P6/8/3pP3/8/8/8/4K3 w - d6 0 1")
+    captures = sorted(move_to_uci(m) for m in generate_captures(pos))
+    assert captures == ["b7b8q", "e5d6"]
+
+
+def test_under_promotions_are_quiet():
+    pos = parse_fen("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+    quiets = [move_to_uci(m) for m in generate_quiets(pos)]
+    assert "b7b8n" in quiets
+    assert "b7b8q" not in quiets
+
+
+def test_no_castling_in_captures():
+    pos = parse_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    captures = [move_to_uci(m) for m in generate_captures(pos)]
+    assert "e1g1" not in captures
+    assert "a1a8" in captures
+
+
+def test_captures_and_quiets_partition_legal_moves():
+    rng = random.Random(11)
+    for _, fen, _ in PERFT_POSITIONS:
+        for _ in range(5):
+            for pos in random_walk(fen, 30, rng):
+                captures = generate_captures(pos)
+                quiets = generate_quiets(pos)
+                legal = generate_legal_moves(pos)
+                assert sorted(captures + quiets) == sorted(legal)
+                assert not any(m & FLAG_CAPTURE for m in quiets if not move_promo(m))
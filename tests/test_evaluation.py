@@ -1,5 +1,18 @@
+import random
+
+import pytest
+
 from engine.fen import parse_fen
-from engine.evaluation import evaluate
+from engine.evaluation import (
+    evaluate, evaluate_relative, psqt_from_scratch, phase_from_scratch, taper, _piece_activity,
+    pack_score, mg_score, eg_score, PHASE_MAX, MOBILITY_WEIGHTS,
+    pawn_structure, DOUBLED_PAWN, ISOLATED_PAWN, BACKWARD_PAWN, PASSED_PAWN,
+    EvalCache, PawnTable, pawn_table, eval_cache,
+)
+from engine.makeunmake import make_move, unmake_move
+from engine.movegen import find_move
+from engine.position import WHITE
+from helpers import random_walk
 
 
 def test_starting_position_is_equal():
@@ -29,7 +42,9 @@ def test_white_up_rook_for_knight():
     pos = parse_fen("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")
     white_score = 500  # rook
     black_score = 0
-    assert evaluate(pos) == white_score - black_score
+    # The rook on a1 reaches a2-a8 and b1-d1
+    mobility = taper(10 * MOBILITY_WEIGHTS[3], pos.phase)
+    assert evaluate(pos) == white_score - black_score + mobility
 
 
 def test_complex_position():
@@ -45,4 +60,151 @@ def test_complex_position():
 
 def test_only_kings():
     pos = parse_fen("4k3/8/8/8/8/8/8/4K3 w - - 0 1")
-    assert evaluate(pos) == 0
\ No newline at end of file
+    assert evaluate(pos) == 0
+
+def test_incremental_psqt_matches_recompute():
+    rng = random.Random(3)
+    # Kiwipete for castling and en passant, the other one for promotions
+    for fen in ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1"):
+        for _ in range(10):
+            for pos in random_walk(fen, 30, rng):
+                assert pos.psqt == psqt_from_scratch(pos)
+                assert pos.phase == phase_from_scratch(pos)
+            # Taking every move back restores the starting scores
+            while pos.undo_ply:
+                unmake_move(pos)
+            start = parse_fen(fen)
+            assert (pos.psqt, pos.phase) == (start.psqt, start.phase)
+
+def test_packed_scores_round_trip():
+    for mg, eg in ((0, 0), (35, -20), (-900, 1200), (-5, -5), (8000, -8000)):
+        score = pack_score(mg, eg)
+        assert (mg_score(score), eg_score(score)) == (mg, eg)
+        assert mg_score(-score) == -mg and eg_score(-score) == -eg
+
+
+def test_game_phase():
+    assert parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1").phase == PHASE_MAX
+    assert parse_fen("4k3/pppp4/8/8/8/8/PPPP4/4K3 w - - 0 1").phase == 0
+    assert parse_fen("4k3/8/8/8/8/8/8/R3K3 w - - 0 1").phase == 2
+
+
+def test_endgame_king_wants_the_centre():
+    # With only pawns left the king on e4 beats the king on g1
+    centre = parse_fen("6k1/5ppp/8/8/4K3/8/5PPP/8 w - - 0 1")
+    corner = parse_fen("6k1/5ppp/8/8/8/8/5PPP/6K1 w - - 0 1")
+    assert evaluate(centre) > evaluate(corner)
+
+
+def test_middlegame_king_wants_shelter():
+    # With everything still on the board the castled king is better
+    castled = parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQ1RK1 w kq - 0 1")
+    centre = parse_fen("rnbqkbnr/pppppppp/8/8/8/4K3/PPPPPPPP/RNBQ1R2 w kq - 0 1")
+    assert evaluate(castled) > evaluate(centre)
+
+
+def test_pawn_structure_terms():
+    def pawns(fen):
+        pos = parse_fen(fen)
+        return pawn_structure(pos.pieces[0], pos.pieces[6])
+
+    # Doubled and isolated: white e2 e3 vs black e7 d7
+    assert pawns("4k3/3pp3/8/8/8/4P3/4P3/4K3 w - - 0 1") == DOUBLED_PAWN + 2 * ISOLATED_PAWN
+    # A lone pawn on the 6th rank is passed (and isolated)
+    assert pawns("4k3/8/3P4/8/8/8/8/4K3 w - - 0 1") == PASSED_PAWN[5] + ISOLATED_PAWN
+    # The same for black is the mirror image
+    assert pawns("4k3/8/8/8/8/3p4/8/4K3 w - - 0 1") == -(PASSED_PAWN[5] + ISOLATED_PAWN)
+    # d3 is backward: c4 and e4 are past it and d4 is covered by the pawn on e5.
+    # c4 is passed and the black pawn is isolated.
+    score = pawns("4k3/8/8/4p3/2P1P3/3P4/8/4K3 w - - 0 1")
+    assert score == BACKWARD_PAWN + PASSED_PAWN[3] - ISOLATED_PAWN
+
+
+def test_pawn_table_caches_by_pawn_hash():
+    pos = parse_fen("4k3/pp6/8/8/8/8/PP6/R3K3 w - - 0 1")
+    pawn_table.clear()
+    score = pawn_table.probe(pos)
+    assert score == pawn_structure(pos.pieces[0], pos.pieces[6])
+    assert pawn_table.table[pos.pawn_hash & pawn_table.mask] == (pos.pawn_hash, score)
+    assert pawn_table.probe(pos) == score
+
+
+def test_mobility_rewards_active_pieces():
+    # Knight in the centre against a knight in the corner, kings mirrored
+    centre = parse_fen("4k3/8/8/8/3N4/8/8/4K3 w - - 0 1")
+    corner = parse_fen("4k3/8/8/8/8/8/8/N3K3 w - - 0 1")
+    assert evaluate(centre) > evaluate(corner)
+
+
+def test_king_attackers_add_danger():
+    # Knight mobility counts the same in mg and eg, so anything extra in mg is king danger.
+    # Knights on f5 and h6 hit g7 and f7 next to the black king: 2 attackers, 4 units.
+    both = _piece_activity(parse_fen("6k1/8/7N/5N2/8/8/8/K7 w - - 0 1"), WHITE)
+    assert mg_score(both) - eg_score(both) == 4 * 4 * 2
+    # One attacker on its own adds nothing
+    one = _piece_activity(parse_fen("6k1/8/8/5N2/8/8/8/K7 w - - 0 1"), WHITE)
+    assert mg_score(one) == eg_score(one)
+
+
+def test_lazy_eval_skips_activity_outside_window():
+    pos = parse_fen("4k3/8/8/8/3N4/8/8/4K3 w - - 0 1")
+    full = evaluate(pos)
+    lazy = evaluate(pos, 2000, 2001)
+    assert lazy != full
+    assert lazy < 2000
+    # Inside the window the full score comes back
+    assert evaluate(pos, full - 10, full + 10) == full
+
+
+def test_eval_cache_stores_side_relative_scores():
+    pos = parse_fen("4k3/8/8/8/3N4/8/8/4K3 w - - 0 1")
+    make_move(pos, find_move(pos, "e1d2"))
+    eval_cache.clear()
+    score = evaluate_relative(pos, -10_000, 10_000)
+    # Black to move, so the score is the negated white score
+    assert score == -evaluate(pos)
+    assert (eval_cache.hits, eval_cache.misses) == (0, 1)
+    assert evaluate_relative(pos, -10_000, 10_000) == score
+    assert (eval_cache.hits, eval_cache.misses) == (1, 1)
+
+    # Lazy scores depend on the window and are not cached
+    eval_cache.clear()
+    evaluate_relative(pos, 5000, 5001)
+    assert eval_cache.probe(pos.hash) is None
+
+    # Direct mapped: a new entry replaces whatever shared its slot
+    cache = EvalCache(4)
+    cache.store(1, 10)
+    cache.store(5, 20)
+    assert cache.probe(1) is None and cache.probe(5) == 20
+
+
+def _mirror_fen(fen):
+    """The same position with colours swapped and the board flipped top to bottom."""
+    placement, stm, castling, ep, halfmove, fullmove = fen.split()
+    placement = "/".join(reversed(placement.split("/"))).swapcase()
+    stm = "b" if stm == "w" else "w"
+    castling = "".join(sorted(castling.swapcase())) if castling != "-" else "-"
+    if ep != "-":
+        ep = ep[0] + ("3" if ep[1] == "6" else "6")
+    return " ".join((placement, stm, castling, ep, halfmove, fullmove))
+
+
+def test_evaluation_is_colour_symmetric():
+    for fen in (
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "4k3/8/8/8/3N4/8/8/4K3 w - - 0 1",
+        "6k1/5ppp/8/8/4K3/8/5PPP/8 w - - 0 1",
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    ):
+        assert evaluate(parse_fen(_mirror_fen(fen))) == -evaluate(parse_fen(fen))
+
+
+def test_score_cache_size_must_be_a_power_of_two():
+    with pytest.raises(AssertionError):
+        EvalCache(1000)
+    with pytest.raises(AssertionError):
+        PawnTable(0)
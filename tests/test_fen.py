@@ -0,0 +1,38 @@
+from engine.fen import parse_fen, to_fen
+from engine.makeunmake import make_move, unmake_move
+from engine.movegen import find_move
+from engine.position import WHITE, BLACK, CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "rnbqkbnr/ppp1pppp/8/3pP3/8/8/PPPP1PPP/RNBQKBNR w Kq d6 0 3",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 b - - 7 10",
+]
+
+def test_round_trip():
+    for fen in FENS:
+        assert to_fen(parse_fen(fen)) == fen
+
+def test_side_to_move_and_castling_fields():
+    pos = parse_fen(FENS[3])
+    assert pos.stm == WHITE
+    assert pos.side_to_move == "w"
+    assert pos.castling_rights == CASTLE_WK | CASTLE_BQ
+    assert pos.castling == "Kq"
+
+def test_rights_cleared_by_rook_capture():
+    pos = parse_fen("r3k2r/8/8/8/8/8/6B1/R3K2R w KQkq - 0 1")
+    make_move(pos, find_move(pos, "g2a8"))
+    assert pos.stm == BLACK
+    assert pos.castling_rights == CASTLE_WK | CASTLE_WQ | CASTLE_BK
+    unmake_move(pos)
+    assert pos.castling_rights == CASTLE_WK | CASTLE_WQ | CASTLE_BK | CASTLE_BQ
+    assert pos.stm == WHITE
+
+def test_fen_after_moves():
+    pos = parse_fen(FENS[0])
+    for uci in ("e2e4", "c7c5", "e1e2"):
+        make_move(pos, find_move(pos, uci))
+    assert to_fen(pos) == "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPPKPPP/RNBQ1BNR b kq - 1 2"
@@ -1,57 +1,110 @@
+import random
+
 from engine.fen import parse_fen
-from engine.move import Move
+from engine.movegen import find_move, generate_legal_moves, generate_all_moves
+from engine.move import encode_move, FLAG_CAPTURE, move_to_uci
 from engine.bitboard import uci_to_sq
 from engine.move_validator import is_legal
+from helpers import random_walk
 
 
 def test_normal_move_is_legal():
     pos = parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
-    move = Move(uci_to_sq("e2"), uci_to_sq("e4"))
+    move = find_move(pos, "e2e4")
     assert is_legal(pos, move)
 
 
 def test_moving_pinned_piece_is_illegal():
     # White bishop on e2 is pinned by black rook on e8
     pos = parse_fen("4r3/8/8/8/8/8/4B3/4K3 w - - 0 1")
-    move = Move(uci_to_sq("e2"), uci_to_sq("d3"))  # Bishop moves off the pin
+    move = find_move(pos, "e2d3")  # Bishop moves off the pin
     assert not is_legal(pos, move)
 
 
 def test_pinned_piece_can_move_along_pin():
     # White rook on e2 is pinned by black rook on e8, but can move along the file
     pos = parse_fen("4r3/8/8/8/8/8/4R3/4K3 w - - 0 1")
-    move = Move(uci_to_sq("e2"), uci_to_sq("e5"))  # Rook moves along pin line
+    move = find_move(pos, "e2e5")  # Rook moves along pin line
     assert is_legal(pos, move)
 
 
 def test_king_cannot_move_into_check():
     pos = parse_fen("8/8/8/8/4r3/8/8/4K3 w - - 0 1")
-    move = Move(uci_to_sq("e1"), uci_to_sq("e2"))  # King walks into rook's line
+    move = find_move(pos, "e1e2")  # King walks into rook's line
     assert not is_legal(pos, move)
 
 
 def test_king_can_escape_check():
     pos = parse_fen("8/8/8/8/4r3/8/8/4K3 w - - 0 1")
-    move = Move(uci_to_sq("e1"), uci_to_sq("f1"))  # King escapes sideways
+    move = find_move(pos, "e1f1")  # King escapes sideways
     assert is_legal(pos, move)
 
 
 def test_must_block_check():
     # King in check by rook, bishop can block
     pos = parse_fen("4r3/8/8/8/8/8/4B3/4K3 w - - 0 1")
-    move = Move(uci_to_sq("e2"), uci_to_sq("e4"))  # Bishop blocks
+    move = encode_move(uci_to_sq("e2"), uci_to_sq("e4"))  # Bishop blocks
     assert is_legal(pos, move)
 
 
 def test_capturing_attacker_is_legal():
     # King in check by knight, queen can capture it
     pos = parse_fen("8/8/5n2/8/8/8/4Q3/4K3 w - - 0 1")
-    move = Move(uci_to_sq("e2"), uci_to_sq("f6"))  # Queen captures knight
+    move = encode_move(uci_to_sq("e2"), uci_to_sq("f6"), flags=FLAG_CAPTURE)  # Queen captures knight
     assert is_legal(pos, move)
 
 
 def test_king_cannot_capture_defended_piece():
     # Black rook on e2 defended by rook on e8
     pos = parse_fen("4r3/8/8/8/8/8/4r3/4K3 w - - 0 1")
-    move = Move(uci_to_sq("e1"), uci_to_sq("e2"))  # King captures but still in check
-    assert not is_legal(pos, move)
\ No newline at end of file
+    move = find_move(pos, "e1e2")  # King captures but still in check
+    assert not is_legal(pos, move)
+
+def _legal_ucis(fen):
+    return sorted(move_to_uci(m) for m in generate_legal_moves(parse_fen(fen)))
+
+
+def test_generator_pinned_piece_stays_on_pin_line():
+    moves = _legal_ucis("4r3/8/8/8/8/8/4R3/4K3 w - - 0 1")
+    assert "e2e5" in moves
+    assert "e2e8" in moves
+    assert "e2d2" not in moves
+
+
+def test_generator_double_check_only_king_moves():
+    # Rook on e8 and bishop on b4 both check the king on e1, the a2 rook could block either alone
+    moves = _legal_ucis("4r1k1/8/8/8/1b6/8/R7/4K3 w - - 0 1")
+    assert all(m.startswith("e1") for m in moves)
+
+
+def test_generator_king_cannot_retreat_along_check_line():
+    moves = _legal_ucis("4r1k1/8/8/8/8/8/4K3/8 w - - 0 1")
+    assert "e2e1" not in moves
+    assert "e2d1" in moves
+
+
+def test_generator_en_passant_discovered_check_is_illegal():
+    # Taking d4xe3 would leave both pawns off the 4th rank, exposing the king to the queen
+    moves = _legal_ucis("8/8/8/8/k2Pp2Q/8/8/3K4 b - d3 0 1")
+    assert "e4d3" not in moves
+
+
+def test_generator_en_passant_can_capture_checking_pawn():
+    # d2-d4 gave check to the king on e5, taking en passant removes the checker
+    moves = _legal_ucis("8/8/8/4k3/3Pp3/8/8/4K3 b - d3 0 1")
+    assert "e4d3" in moves
+
+
+def test_generator_matches_make_and_test():
+    rng = random.Random(3)
+    fens = [
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    ]
+    for fen in fens:
+        for _ in range(10):
+            for pos in random_walk(fen, 40, rng):
+                legal = sorted(generate_legal_moves(pos))
+                expected = sorted(m for m in generate_all_moves(pos) if is_legal(pos, m))
+                assert legal == expected
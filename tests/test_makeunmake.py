@@ -1,155 +1,236 @@
 from engine.fen import parse_fen
-from engine.makeunmake import make_move
-from engine.move import Move
+from engine.makeunmake import make_move, unmake_move, make_null_move, unmake_null_move
+from engine.movegen import find_move, generate_legal_moves
+from engine.move import encode_move, move_to_uci
 from engine.bitboard import is_set, uci_to_sq
 from engine.position import PIECE_TO_INDEX
+from engine.zobrist import hash_position
 
 def test_simple_pawn_push():
     pos = parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
-    move = Move(uci_to_sq("e2"), uci_to_sq("e4"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e2e4")
+    make_move(pos, move)
     
     # Pawn should be on e4, not e2
-    assert not is_set(new_pos.pieces[PIECE_TO_INDEX["P"]], uci_to_sq("e2"))
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["P"]], uci_to_sq("e4"))
+    assert not is_set(pos.pieces[PIECE_TO_INDEX["P"]], uci_to_sq("e2"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["P"]], uci_to_sq("e4"))
     # Side to move should switch
-    assert new_pos.side_to_move == "b"
+    assert pos.side_to_move == "b"
     # En passant square should be set
-    assert new_pos.ep_square == uci_to_sq("e3")
+    assert pos.ep_square == uci_to_sq("e3")
 
 def test_capture():
     pos = parse_fen("8/8/8/3p4/4P3/8/8/8 w - - 0 1")
-    move = Move(uci_to_sq("e4"), uci_to_sq("d5"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e4d5")
+    make_move(pos, move)
     
     # White pawn should be on d5
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["P"]], uci_to_sq("d5"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["P"]], uci_to_sq("d5"))
     # Black pawn should be gone
-    assert not is_set(new_pos.pieces[PIECE_TO_INDEX["p"]], uci_to_sq("d5"))
+    assert not is_set(pos.pieces[PIECE_TO_INDEX["p"]], uci_to_sq("d5"))
     # Halfmove clock should reset on capture
-    assert new_pos.halfmove_clock == 0
+    assert pos.halfmove_clock == 0
 
 def test_en_passant_capture():
     # White pawn on e5, black just played d7d5
     pos = parse_fen("8/8/8/3pP3/8/8/8/8 w - d6 0 1")
-    move = Move(uci_to_sq("e5"), uci_to_sq("d6"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e5d6")
+    make_move(pos, move)
     
     # White pawn should be on d6
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["P"]], uci_to_sq("d6"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["P"]], uci_to_sq("d6"))
     # Black pawn on d5 should be captured
-    assert not is_set(new_pos.pieces[PIECE_TO_INDEX["p"]], uci_to_sq("d5"))
+    assert not is_set(pos.pieces[PIECE_TO_INDEX["p"]], uci_to_sq("d5"))
 
 def test_promotion():
     pos = parse_fen("8/4P3/8/8/8/8/8/8 w - - 0 1")
-    move = Move(uci_to_sq("e7"), uci_to_sq("e8"), "q")
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e7e8q")
+    make_move(pos, move)
     
     # Pawn should be gone
-    assert not is_set(new_pos.pieces[PIECE_TO_INDEX["P"]], uci_to_sq("e8"))
+    assert not is_set(pos.pieces[PIECE_TO_INDEX["P"]], uci_to_sq("e8"))
     # Queen should be on e8
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["Q"]], uci_to_sq("e8"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["Q"]], uci_to_sq("e8"))
 
 def test_promotion_capture():
     pos = parse_fen("3r4/4P3/8/8/8/8/8/8 w - - 0 1")
-    move = Move(uci_to_sq("e7"), uci_to_sq("d8"), "q")
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e7d8q")
+    make_move(pos, move)
     
     # Queen should be on d8
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["Q"]], uci_to_sq("d8"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["Q"]], uci_to_sq("d8"))
     # Black rook should be captured
-    assert not is_set(new_pos.pieces[PIECE_TO_INDEX["r"]], uci_to_sq("d8"))
+    assert not is_set(pos.pieces[PIECE_TO_INDEX["r"]], uci_to_sq("d8"))
 
 def test_kingside_castling_white():
     pos = parse_fen("r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1")
-    move = Move(uci_to_sq("e1"), uci_to_sq("g1"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e1g1")
+    make_move(pos, move)
     
     # King should be on g1
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["K"]], uci_to_sq("g1"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["K"]], uci_to_sq("g1"))
     # Rook should be on f1
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["R"]], uci_to_sq("f1"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["R"]], uci_to_sq("f1"))
     # Rook should not be on h1
-    assert not is_set(new_pos.pieces[PIECE_TO_INDEX["R"]], uci_to_sq("h1"))
+    assert not is_set(pos.pieces[PIECE_TO_INDEX["R"]], uci_to_sq("h1"))
     # White castling rights should be gone
-    assert "K" not in new_pos.castling
-    assert "Q" not in new_pos.castling
+    assert "K" not in pos.castling
+    assert "Q" not in pos.castling
 
 def test_queenside_castling_white():
     pos = parse_fen("r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1")
-    move = Move(uci_to_sq("e1"), uci_to_sq("c1"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e1c1")
+    make_move(pos, move)
     
     # King should be on c1
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["K"]], uci_to_sq("c1"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["K"]], uci_to_sq("c1"))
     # Rook should be on d1
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["R"]], uci_to_sq("d1"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["R"]], uci_to_sq("d1"))
     # Rook should not be on a1
-    assert not is_set(new_pos.pieces[PIECE_TO_INDEX["R"]], uci_to_sq("a1"))
+    assert not is_set(pos.pieces[PIECE_TO_INDEX["R"]], uci_to_sq("a1"))
 
 def test_kingside_castling_black():
     pos = parse_fen("r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R b KQkq - 0 1")
-    move = Move(uci_to_sq("e8"), uci_to_sq("g8"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e8g8")
+    make_move(pos, move)
     
     # King should be on g8
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["k"]], uci_to_sq("g8"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["k"]], uci_to_sq("g8"))
     # Rook should be on f8
-    assert is_set(new_pos.pieces[PIECE_TO_INDEX["r"]], uci_to_sq("f8"))
+    assert is_set(pos.pieces[PIECE_TO_INDEX["r"]], uci_to_sq("f8"))
     # Black castling rights should be gone
-    assert "k" not in new_pos.castling
-    assert "q" not in new_pos.castling
+    assert "k" not in pos.castling
+    assert "q" not in pos.castling
 
 def test_rook_move_removes_castling_rights():
     pos = parse_fen("r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1")
-    move = Move(uci_to_sq("h1"), uci_to_sq("h2"))
-    new_pos = make_move(pos, move)
+    move = encode_move(uci_to_sq("h1"), uci_to_sq("h2"))
+    make_move(pos, move)
     
     # Kingside castling right should be gone
-    assert "K" not in new_pos.castling
+    assert "K" not in pos.castling
     # Queenside should remain
-    assert "Q" in new_pos.castling
+    assert "Q" in pos.castling
 
 def test_rook_captured_removes_castling_rights():
     # White bishop on b7 can capture the a8 rook
     pos = parse_fen("r3k2r/pBpppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1")
-    move = Move(uci_to_sq("b7"), uci_to_sq("a8"))  # Bishop captures a8 rook
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "b7a8")  # Bishop captures a8 rook
+    make_move(pos, move)
     
     # Black queenside castling right should be gone
-    assert "q" not in new_pos.castling
+    assert "q" not in pos.castling
 
 def test_halfmove_clock_increments():
     pos = parse_fen("8/8/8/8/8/5N2/8/8 w - - 5 10")
-    move = Move(uci_to_sq("f3"), uci_to_sq("e5"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "f3e5")
+    make_move(pos, move)
     
-    assert new_pos.halfmove_clock == 6
+    assert pos.halfmove_clock == 6
 
 def test_halfmove_clock_resets_on_pawn_move():
     pos = parse_fen("8/8/8/8/8/8/4P3/8 w - - 5 10")
-    move = Move(uci_to_sq("e2"), uci_to_sq("e4"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e2e4")
+    make_move(pos, move)
     
-    assert new_pos.halfmove_clock == 0
+    assert pos.halfmove_clock == 0
 
 def test_fullmove_increments_after_black():
     pos = parse_fen("8/4p3/8/8/8/8/8/8 b - - 0 10")
-    move = Move(uci_to_sq("e7"), uci_to_sq("e5"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e7e5")
+    make_move(pos, move)
     
-    assert new_pos.fullmove_number == 11
+    assert pos.fullmove_number == 11
 
 def test_fullmove_stays_after_white():
     pos = parse_fen("8/8/8/8/8/8/4P3/8 w - - 0 10")
-    move = Move(uci_to_sq("e2"), uci_to_sq("e4"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e2e4")
+    make_move(pos, move)
     
-    assert new_pos.fullmove_number == 10
+    assert pos.fullmove_number == 10
 
 def test_ep_square_cleared_after_non_double_push():
     pos = parse_fen("8/8/8/8/8/4P3/8/8 w - e6 0 1")
-    move = Move(uci_to_sq("e3"), uci_to_sq("e4"))
-    new_pos = make_move(pos, move)
+    move = find_move(pos, "e3e4")
+    make_move(pos, move)
     
-    assert new_pos.ep_square is None
\ No newline at end of file
+    assert pos.ep_square is None
+
+def _snapshot(pos):
+    return (
+        pos.pieces.copy(), pos.white_occ, pos.black_occ, pos.all_occ,
+        pos.side_to_move, pos.castling, pos.ep_square,
+        pos.halfmove_clock, pos.fullmove_number, pos.hash, pos.board.copy(),
+    )
+
+def test_unmake_restores_position():
+    fens_and_moves = [
+        ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", "e2e4"),
+        ("8/8/8/3p4/4P3/8/8/8 w - - 3 1", "e4d5"),
+        ("8/8/8/3pP3/8/8/8/8 w - d6 0 1", "e5d6"),
+        ("8/8/8/8/3pP3/8/8/8 b - e3 0 7", "d4e3"),
+        ("3r4/4P3/8/8/8/8/8/8 w - - 0 1", "e7d8q"),
+        ("8/8/8/8/8/8/4p3/3R4 b - - 0 1", "e2d1n"),
+        ("r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1", "e1g1"),
+        ("r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R b KQkq - 0 1", "e8c8"),
+        ("r3k2r/pBpppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1", "b7a8"),
+    ]
+    for fen, uci in fens_and_moves:
+        pos = parse_fen(fen)
+        before = _snapshot(pos)
+        make_move(pos, find_move(pos, uci))
+        assert _snapshot(pos) != before
+        unmake_move(pos)
+        assert _snapshot(pos) == before
+        assert pos.undo_ply == 0
+
+def test_make_unmake_sequence():
+    pos = parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+    start = _snapshot(pos)
+    snapshots = []
+    for uci in ("e2e4", "d7d5", "e4d5", "d8d5"):
+        snapshots.append(_snapshot(pos))
+        make_move(pos, find_move(pos, uci))
+    for snap in reversed(snapshots):
+        unmake_move(pos)
+        assert _snapshot(pos) == snap
+    assert _snapshot(pos) == start
+
+def _board_matches_bitboards(pos):
+    for sq in range(64):
+        on_sq = [i for i in range(12) if pos.pieces[i] >> sq & 1]
+        expected = on_sq[0] if on_sq else None
+        if len(on_sq) > 1 or pos.board[sq] != expected:
+            return False
+    return True
+
+def test_mailbox_follows_make_and_unmake():
+    # Kiwipete has castling, promotions-to-be and en passant all within a few plies
+    pos = parse_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    assert _board_matches_bitboards(pos)
+    for move in generate_legal_moves(pos):
+        make_move(pos, move)
+        assert _board_matches_bitboards(pos), move_to_uci(move)
+        for reply in generate_legal_moves(pos):
+            make_move(pos, reply)
+            assert _board_matches_bitboards(pos), move_to_uci(reply)
+            unmake_move(pos)
+        unmake_move(pos)
+    assert _board_matches_bitboards(pos)
+
+def test_piece_at():
+    pos = parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+    assert pos.piece_at(4) == 5      # e1: white king
+    assert pos.piece_at(59) == 10    # d8: black queen
+    assert pos.piece_at(28) is None  # e4: empty
+
+def test_null_move_round_trip():
+    pos = parse_fen("rnbqkbnr/ppp1pppp/8/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3")
+    before = _snapshot(pos)
+    make_null_move(pos)
+    assert pos.side_to_move == "b"
+    assert pos.ep_square is None
+    assert pos.hash == hash_position(pos)
+    unmake_null_move(pos)
+    assert _snapshot(pos) == before
+    assert pos.undo_ply == 0
@@ -0,0 +1,29 @@
+from engine.move import (
+    Move, encode_move, move_from, move_to, move_promo, move_to_uci,
+    PROMO_QUEEN, PROMO_KNIGHT, FLAG_CAPTURE, FLAG_DOUBLE_PUSH, NO_MOVE,
+)
+from engine.bitboard import uci_to_sq
+
+
+def test_encode_decode():
+    move = encode_move(uci_to_sq("e7"), uci_to_sq("d8"), PROMO_QUEEN, FLAG_CAPTURE)
+    assert move_from(move) == uci_to_sq("e7")
+    assert move_to(move) == uci_to_sq("d8")
+    assert move_promo(move) == PROMO_QUEEN
+    assert move & FLAG_CAPTURE
+    assert not move & FLAG_DOUBLE_PUSH
+
+
+def test_move_to_uci():
+    assert move_to_uci(encode_move(uci_to_sq("e2"), uci_to_sq("e4"), flags=FLAG_DOUBLE_PUSH)) == "e2e4"
+    assert move_to_uci(encode_move(uci_to_sq("a2"), uci_to_sq("a1"), PROMO_KNIGHT)) == "a2a1n"
+
+
+def test_move_wrapper_from_int():
+    move = encode_move(uci_to_sq("b7"), uci_to_sq("c8"), PROMO_QUEEN, FLAG_CAPTURE)
+    assert Move.from_int(move) == Move(uci_to_sq("b7"), uci_to_sq("c8"), "q")
+    assert Move.from_int(move).to_uci() == "b7c8q"
+
+
+def test_no_move_is_not_a_real_move():
+    assert move_from(NO_MOVE) == move_to(NO_MOVE)
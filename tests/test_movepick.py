@@ -0,0 +1,65 @@
+import random
+
+from engine.fen import parse_fen
+from engine.move import NO_MOVE, FLAG_CAPTURE, encode_move
+from engine.movegen import generate_legal_moves, generate_all_moves, find_move, is_pseudo_legal
+from engine.movepick import pick_moves, is_good_capture
+from helpers import random_walk
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+NO_KILLERS = [NO_MOVE, NO_MOVE]
+NO_HISTORY = [0] * 4096
+
+
+def test_picker_yields_every_legal_move_once():
+    rng = random.Random(7)
+    for pos in random_walk(KIWIPETE, 30, rng):
+        legal = generate_legal_moves(pos)
+        tt_move = rng.choice(legal) if legal else NO_MOVE
+        picked = list(pick_moves(pos, tt_move, NO_KILLERS, NO_MOVE, NO_HISTORY))
+        assert sorted(picked) == sorted(legal)
+
+
+def test_stage_order():
+    pos = parse_fen(KIWIPETE)
+    tt_move = find_move(pos, "a2a3")
+    killer = find_move(pos, "g2g3")
+    picked = list(pick_moves(pos, tt_move, [killer, NO_MOVE], NO_MOVE, NO_HISTORY))
+    assert picked[0] == tt_move
+    good = [m for m in picked if m & FLAG_CAPTURE and is_good_capture(pos, m)]
+    bad = [m for m in picked if m & FLAG_CAPTURE and not is_good_capture(pos, m)]
+    assert bad, "kiwipete has losing captures, e.g. Qxh3"
+    # Winning and even captures straight after the TT move, then the killer,
+    # and the losing captures at the very end
+    assert picked[1:1 + len(good)] == good
+    assert picked[1 + len(good)] == killer
+    assert picked[-len(bad):] == bad
+
+
+def test_quiets_follow_history():
+    pos = parse_fen(KIWIPETE)
+    history = [0] * 4096
+    favourite = find_move(pos, "g2g4")
+    history[favourite & 0xFFF] = 100
+    picked = list(pick_moves(pos, NO_MOVE, NO_KILLERS, NO_MOVE, history))
+    first_quiet = next(m for m in picked if not m & FLAG_CAPTURE)
+    assert first_quiet == favourite
+
+
+def test_table_moves_from_other_positions_are_skipped():
+    pos = parse_fen(KIWIPETE)
+    bogus_tt = encode_move(12, 28)                    # e2e4 onto our own pawn
+    bogus_killer = encode_move(0, 8)                  # a1a2, blocked
+    picked = list(pick_moves(pos, bogus_tt, [bogus_killer, NO_MOVE], NO_MOVE, NO_HISTORY))
+    assert sorted(picked) == sorted(generate_legal_moves(pos))
+
+
+def test_is_pseudo_legal_matches_generator():
+    pos = parse_fen(KIWIPETE)
+    pseudo = set(generate_all_moves(pos))
+    for move in pseudo:
+        assert is_pseudo_legal(pos, move)
+    # Right squares, wrong flags
+    assert not is_pseudo_legal(pos, encode_move(21, 23))  # f3h3 takes a pawn, needs the capture flag
+    assert is_pseudo_legal(pos, encode_move(21, 23, flags=FLAG_CAPTURE))
+    assert not is_pseudo_legal(pos, NO_MOVE)
@@ -1,9 +1,10 @@
 from engine.fen import parse_fen
 from engine.movegen import generate_pawn_moves
+from engine.move import move_to_uci
 
 def test_start_position_white_pawn_pushes():
     pos = parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
-    moves = sorted(m.to_uci() for m in generate_pawn_moves(pos))
+    moves = sorted(move_to_uci(m) for m in generate_pawn_moves(pos))
 
     # from start position, white has 16 pawn pushes (8 single, 8 double)
     assert len(moves) == 16
@@ -13,11 +14,11 @@ def test_start_position_white_pawn_pushes():
 def test_white_pawn_captures():
     # White pawn on d4 can capture c5 and e5 if black pieces there
     pos = parse_fen("8/8/8/2ppp3/3P4/8/8/8 w - - 0 1")
-    moves = sorted(m.to_uci() for m in generate_pawn_moves(pos))
+    moves = sorted(move_to_uci(m) for m in generate_pawn_moves(pos))
     assert moves == ["d4c5", "d4e5"]
 
 def test_black_pawn_pushes_and_captures():
     pos = parse_fen("8/8/8/3p4/4P3/8/8/8 b - - 0 1")
-    moves = sorted(m.to_uci() for m in generate_pawn_moves(pos))
+    moves = sorted(move_to_uci(m) for m in generate_pawn_moves(pos))
     # black pawn on d5 can capture e4 (white pawn)
     assert "d5e4" in moves
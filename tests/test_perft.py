@@ -0,0 +1,32 @@
+import pytest
+
+from engine.fen import parse_fen
+from engine.perft import perft, divide, PERFT_POSITIONS
+
+
+@pytest.mark.parametrize("name,fen,expected", PERFT_POSITIONS, ids=[p[0] for p in PERFT_POSITIONS])
+def test_perft_shallow(name, fen, expected):
+    pos = parse_fen(fen)
+    for depth in (1, 2):
+        assert perft(pos, depth) == expected[depth - 1]
+
+
+def test_perft_depth_3_position3():
+    name, fen, expected = PERFT_POSITIONS[2]
+    assert perft(parse_fen(fen), 3) == expected[2]
+
+
+def test_perft_leaves_position_unchanged():
+    name, fen, expected = PERFT_POSITIONS[1]
+    pos = parse_fen(fen)
+    before = (pos.pieces.copy(), pos.castling, pos.ep_square, pos.hash)
+    perft(pos, 2)
+    assert (pos.pieces, pos.castling, pos.ep_square, pos.hash) == before
+
+
+def test_divide_sums_to_perft():
+    pos = parse_fen(PERFT_POSITIONS[0][1])
+    counts = divide(pos, 2)
+    assert len(counts) == 20
+    assert counts["e2e4"] == 20
+    assert sum(counts.values()) == 400
@@ -0,0 +1,61 @@
+from engine.fen import parse_fen
+from engine.makeunmake import make_move
+from engine.movegen import find_move
+from engine.search import search
+from engine.uci import parse_position
+
+START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+SHUFFLE = ["g1f3", "g8f6", "f3g1", "f6g8"]
+
+
+def _play(pos, moves):
+    for uci in moves:
+        make_move(pos, find_move(pos, uci))
+
+
+def test_twofold_only_counts_inside_the_search():
+    pos = parse_fen(START)
+    _play(pos, SHUFFLE)
+    # Back at the start position once: not a draw as a game position...
+    assert not pos.is_repetition(0)
+    # ...but a draw if the repeat happened inside the search tree
+    assert pos.is_repetition(5)
+
+
+def test_threefold_in_game():
+    pos = parse_fen(START)
+    _play(pos, SHUFFLE * 2)
+    assert pos.is_repetition(0)
+
+
+def test_side_to_move_matters():
+    pos = parse_fen("4k3/8/8/8/8/8/8/4K3 w - - 0 1")
+    # White walks a triangle, so the kings are back where they started
+    # but with black to move
+    _play(pos, ["e1d1", "e8d8", "d1d2", "d8e8", "d2e1"])
+    assert not pos.is_repetition(10)
+
+
+def test_irreversible_move_cuts_the_window():
+    pos = parse_fen("4k3/8/8/8/8/8/4P3/4K1N1 w - - 0 1")
+    _play(pos, ["g1f3", "e8d8", "f3g1", "d8e8"])
+    assert pos.is_repetition(5)
+    _play(pos, ["e2e3", "e8d8", "g1f3", "d8e8", "f3g1"])
+    # Only the four plies since the pawn move are scanned
+    assert pos.halfmove_clock == 4
+    assert pos.is_repetition(5)
+    assert not pos.is_repetition(0)
+
+
+def test_parse_position_keeps_game_history():
+    tokens = ("position startpos moves " + " ".join(SHUFFLE * 2)).split()
+    pos = parse_position(tokens)
+    assert pos.is_repetition(0)
+
+
+def test_fifty_move_rule():
+    # Queen up, but every move reaches halfmove 100 without a mate
+    move, score = search(parse_fen("4k3/8/8/8/8/8/8/3QK3 w - - 99 80"), 3)
+    assert score == 0
+    move, score = search(parse_fen("4k3/8/8/8/8/8/8/3QK3 w - - 0 80"), 3)
+    assert score > 500
@@ -1,5 +1,10 @@
 from engine.fen import parse_fen
-from engine.search import search
+from engine import search as search_module
+from engine.search import (
+    search, info, options, new_game, has_non_pawn_material,
+    format_score, score_to_tt, score_from_tt, CHECKMATE_SCORE, NO_MOVE,
+)
+from engine.evaluation import eval_cache
 
 
 def test_search_returns_a_move():
@@ -35,4 +40,116 @@ def test_search_no_legal_moves():
     pos = parse_fen("k7/2Q5/1K6/8/8/8/8/8 b - - 0 1")
     move, score = search(pos, 1)
     assert move is None
-    assert score == 0
\ No newline at end of file
+    assert score == 0
+
+def test_iterative_deepening_reports_each_depth(capsys):
+    pos = parse_fen("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+    move, score = search(pos, 3)
+    lines = [l for l in capsys.readouterr().out.splitlines() if l.startswith("info depth")]
+    assert [l.split()[2] for l in lines] == ["1", "2", "3"]
+    # The PV printed for the last iteration starts with the move we return
+    assert lines[-1].split(" pv ")[1].split()[0] == move.to_uci()
+    assert " nodes " in lines[-1] and " nps " in lines[-1]
+    assert " hashfull " in lines[-1]
+
+
+def test_search_leaves_position_unchanged():
+    fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+    pos = parse_fen(fen)
+    search(pos, 3)
+    assert pos.hash == parse_fen(fen).hash
+    assert pos.undo_ply == 0
+
+
+def test_quiet_cutoffs_fill_killers_and_history():
+    new_game()
+    pos = parse_fen("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+    search(pos, 4)
+    assert any(k[0] != NO_MOVE for k in info.killers)
+    assert any(info.history[0]) or any(info.history[1])
+    assert any(m != NO_MOVE for m in info.countermoves)
+
+    new_game()
+    assert all(k == [NO_MOVE, NO_MOVE] for k in info.killers)
+    assert not any(info.history[0]) and not any(info.history[1])
+
+
+def test_selectivity_switches_keep_tactics():
+    saved = (options.pvs, options.null_move, options.lmr)
+    try:
+        for flags in ((True, True, True), (False, False, False), (True, False, True), (False, True, False)):
+            options.pvs, options.null_move, options.lmr = flags
+            # Back rank mate in one: Re8#
+            pos = parse_fen("6k1/5ppp/8/8/8/8/5PPP/4R1K1 w - - 0 1")
+            move, _ = search(pos, 4)
+            assert move.to_uci() == "e1e8", flags
+    finally:
+        options.pvs, options.null_move, options.lmr = saved
+
+
+def test_null_move_skipped_with_only_pawns():
+    assert not has_non_pawn_material(parse_fen("4k3/4p3/8/8/8/8/4P3/4K3 w - - 0 1"))
+    assert has_non_pawn_material(parse_fen("4k3/4p3/8/8/8/8/4P3/4KN2 w - - 0 1"))
+
+
+def last_pv(out):
+    # Moves of the PV on the final "info depth" line.
+    line = [l for l in out.splitlines() if l.startswith("info depth")][-1]
+    return line.split(" pv ")[1].split()
+
+
+def test_mate_scores_count_distance(capsys):
+    # Mate in one: Re8#
+    move, score = search(parse_fen("6k1/5ppp/8/8/8/8/5PPP/4R1K1 w - - 0 1"), 3)
+    assert score == CHECKMATE_SCORE - 1
+    out = capsys.readouterr().out
+    assert "score mate 1 " in out
+    assert last_pv(out)[-1] == "e1e8"
+
+    # Mate in two: 1. Ree8+ Rxe8 2. Rxe8#
+    move, score = search(parse_fen("r5k1/5ppp/8/8/8/8/4RPPP/4R1K1 w - - 0 1"), 4)
+    assert move.to_uci() == "e2e8"
+    assert score == CHECKMATE_SCORE - 3
+    out = capsys.readouterr().out
+    assert "score mate 2 " in out
+    assert last_pv(out) == ["e2e8", "a8e8", "e1e8"]
+
+
+def test_getting_mated_reports_negative_mate():
+    assert format_score(-CHECKMATE_SCORE + 2) == "mate -1"
+    assert format_score(CHECKMATE_SCORE - 3) == "mate 2"
+    assert format_score(-35) == "cp -35"
+
+
+def test_tt_mate_scores_are_ply_independent():
+    # Mate in 3 plies seen from ply 5 is mate in 8 plies from the root
+    stored = score_to_tt(CHECKMATE_SCORE - 8, 5)
+    assert stored == CHECKMATE_SCORE - 3
+    # The same position reached at ply 1 is mate 4 plies from that root
+    assert score_from_tt(stored, 1) == CHECKMATE_SCORE - 4
+    assert score_from_tt(score_to_tt(120, 7), 2) == 120
+
+
+def test_search_reports_eval_cache_stats(capsys):
+    pos = parse_fen("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+    search(pos, 3)
+    lines = [l for l in capsys.readouterr().out.splitlines() if l.startswith("info string evalcache")]
+    assert len(lines) == 1
+    assert f"hits {eval_cache.hits} misses {eval_cache.misses} " in lines[0]
+    assert eval_cache.hits + eval_cache.misses > 0
+
+
+def test_aspiration_opens_window_after_repeated_fails(monkeypatch):
+    calls = []
+    original = search_module.search_root
+
+    def counting_root(pos, moves, depth, alpha, beta):
+        calls.append(depth)
+        return original(pos, moves, depth, alpha, beta)
+
+    monkeypatch.setattr(search_module, "search_root", counting_root)
+    # A mate turns up at depth 3, far outside the first window
+    pos = parse_fen("r5rk/5p1p/5R2/4B3/8/8/7P/7K w - - 0 1")
+    search(pos, 4)
+    # Before the cap it took 11 fail highs at depth 3 to reach the mate score
+    assert calls.count(3) <= 1 + search_module.ASPIRATION_MAX_FAILS
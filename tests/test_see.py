@@ -0,0 +1,44 @@
+from engine.fen import parse_fen
+from engine.movegen import find_move
+from engine.see import see
+
+
+def _see(fen, uci):
+    pos = parse_fen(fen)
+    return see(pos, find_move(pos, uci))
+
+
+def test_undefended_capture():
+    assert _see("4k3/8/8/3p4/8/8/8/3RK3 w - - 0 1", "d1d5") == 100
+
+
+def test_queen_takes_pawn_defended_by_pawn():
+    assert _see("4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1", "d1d5") == 100 - 900
+
+
+def test_even_trade():
+    # NxN, pxN
+    assert _see("4k3/8/2p5/3n4/8/4N3/8/4K3 w - - 0 1", "e3d5") == 0
+
+
+def test_xray_battery_wins_the_exchange():
+    # Rd2xd5 Rxd5 Rxd5: black should not recapture, white wins the pawn
+    assert _see("3rk3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1", "d2d5") == 100
+    # Without the rook behind, the first rook is simply lost for a pawn
+    assert _see("3rk3/8/8/3p4/8/8/3R4/4K3 w - - 0 1", "d2d5") == 100 - 500
+
+
+def test_pawn_capture_uncovers_bishop():
+    # exd5 cxd5, then the bishop behind e4 wins the pawn back: Bxd5
+    assert _see("4k3/8/2p5/3p4/4P3/5B2/8/4K3 w - - 0 1", "e4d5") == 100
+
+
+def test_king_cannot_recapture_into_defended_square():
+    # Rxe1 Kxe1 loses the exchange for black...
+    assert _see("4k3/8/8/8/8/8/8/3KB1r1 b - - 0 1", "g1e1") == 330 - 500
+    # ...unless the bishop on h4 covers e1, then the king can't take back
+    assert _see("4k3/8/8/8/7b/8/8/3KB1r1 b - - 0 1", "g1e1") == 330
+
+
+def test_en_passant():
+    assert _see("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6") == 100
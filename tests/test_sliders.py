@@ -0,0 +1,55 @@
+import random
+
+from engine.sliders import (
+    rook_attacks, bishop_attacks, queen_attacks, ray_attacks, _ray_walk,
+    NORTH, SOUTH, EAST, WEST, NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST,
+)
+from engine.bitboard import uci_to_sq
+
+ROOK_DIRS = (NORTH, SOUTH, EAST, WEST)
+BISHOP_DIRS = (NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST)
+
+
+def _slow_attacks(sq, occ, directions):
+    attacks = 0
+    for d in directions:
+        attacks |= _ray_walk(sq, d, occ)
+    return attacks
+
+
+def test_tables_match_ray_walk():
+    rng = random.Random(1)
+    for _ in range(200):
+        occ = rng.getrandbits(64) & rng.getrandbits(64)  # ~25% density
+        for sq in range(64):
+            assert rook_attacks(sq, occ) == _slow_attacks(sq, occ, ROOK_DIRS)
+            assert bishop_attacks(sq, occ) == _slow_attacks(sq, occ, BISHOP_DIRS)
+            for d in ROOK_DIRS + BISHOP_DIRS:
+                assert ray_attacks(sq, d, occ) == _ray_walk(sq, d, occ)
+
+
+def test_rook_empty_board():
+    # A rook always sees 14 squares on an empty board
+    for sq in range(64):
+        assert bin(rook_attacks(sq, 0)).count("1") == 14
+
+
+def test_blocker_is_included():
+    e4 = uci_to_sq("e4")
+    e6 = uci_to_sq("e6")
+    attacks = rook_attacks(e4, 1 << e6)
+    assert attacks & (1 << e6)
+    assert not attacks & (1 << uci_to_sq("e7"))
+
+
+def test_no_wraparound():
+    h4 = uci_to_sq("h4")
+    attacks = bishop_attacks(h4, 0)
+    assert not attacks & (1 << uci_to_sq("a6"))
+    assert attacks & (1 << uci_to_sq("g5"))
+
+
+def test_queen_is_rook_plus_bishop():
+    occ = 0x0000_1824_0042_1800
+    for sq in range(64):
+        assert queen_attacks(sq, occ) == rook_attacks(sq, occ) | bishop_attacks(sq, occ)
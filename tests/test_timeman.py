@@ -0,0 +1,62 @@
+import time
+
+from engine.fen import parse_fen
+from engine.position import WHITE, BLACK
+from engine.search import search, info, CHECK_INTERVAL
+from engine.timeman import SearchLimits, allocate_time, MOVE_OVERHEAD_MS
+from engine.uci import parse_go
+
+START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def test_parse_go_clock():
+    limits = parse_go("go wtime 60000 btime 50000 winc 1000 binc 500 movestogo 20".split())
+    assert limits.wtime == 60000
+    assert limits.btime == 50000
+    assert limits.winc == 1000
+    assert limits.binc == 500
+    assert limits.movestogo == 20
+    assert limits.depth is None
+
+
+def test_parse_go_other_limits():
+    assert parse_go("go depth 7".split()).depth == 7
+    assert parse_go("go nodes 5000".split()).nodes == 5000
+    assert parse_go("go movetime 250".split()).movetime == 250
+    assert parse_go("go infinite".split()).infinite
+
+
+def test_movetime_budget():
+    soft, hard = allocate_time(SearchLimits(movetime=1000), WHITE)
+    assert soft == hard == 1000 - MOVE_OVERHEAD_MS
+
+
+def test_clock_budget_uses_own_clock():
+    limits = SearchLimits(wtime=60000, btime=6000, winc=0, binc=0)
+    white_soft, white_hard = allocate_time(limits, WHITE)
+    black_soft, black_hard = allocate_time(limits, BLACK)
+    assert black_soft < white_soft
+    assert white_soft <= white_hard < 60000
+    assert black_hard < 6000
+
+
+def test_untimed_budget():
+    assert allocate_time(SearchLimits(depth=5), WHITE) == (None, None)
+    assert allocate_time(SearchLimits(wtime=1000, infinite=True), WHITE) == (None, None)
+
+
+def test_movetime_search_stops_in_time():
+    pos = parse_fen(START)
+    start = time.perf_counter()
+    move, _ = search(pos, limits=SearchLimits(movetime=300))
+    assert move is not None
+    assert time.perf_counter() - start < 1.0
+    assert pos.undo_ply == 0
+
+
+def test_node_limit():
+    pos = parse_fen(START)
+    move, _ = search(pos, limits=SearchLimits(nodes=2000))
+    assert move is not None
+    # Checked every CHECK_INTERVAL nodes, so we may overshoot by a little
+    assert info.nodes < 2000 + CHECK_INTERVAL
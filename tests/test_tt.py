@@ -0,0 +1,88 @@
+import random
+import tracemalloc
+
+from engine.tt import TranspositionTable, EXACT, LOWER, UPPER
+from engine.move import encode_move, NO_MOVE
+
+
+def test_store_and_probe():
+    tt = TranspositionTable(1)
+    tt.store(12345, 3, 50, EXACT, encode_move(12, 28))
+    entry = tt.probe(12345)
+    assert entry is not None
+    assert entry[1] == 3
+    assert entry[2] == 50
+    assert entry[3] == EXACT
+    assert entry[4] == encode_move(12, 28)
+
+
+def test_probe_miss():
+    tt = TranspositionTable(1)
+    assert tt.probe(12345) is None
+
+
+def test_size_is_bounded_by_hash_mb():
+    small = TranspositionTable(1)
+    big = TranspositionTable(4)
+    assert len(big.table) == 4 * len(small.table)
+
+
+def test_shallow_entry_goes_to_always_replace_slot():
+    tt = TranspositionTable(1)
+    key_a = 5
+    key_b = 5 + tt.num_buckets  # Same bucket, different position
+    tt.store(key_a, 6, 10, EXACT, NO_MOVE)
+    tt.store(key_b, 2, 20, LOWER, NO_MOVE)
+
+    # Deep entry survives, shallow one is still reachable
+    assert tt.probe(key_a)[1] == 6
+    assert tt.probe(key_b)[1] == 2
+
+
+def test_deeper_entry_replaces_depth_preferred_slot():
+    tt = TranspositionTable(1)
+    key_a = 5
+    key_b = 5 + tt.num_buckets
+    tt.store(key_a, 2, 10, EXACT, NO_MOVE)
+    tt.store(key_b, 6, 20, UPPER, NO_MOVE)
+
+    assert tt.probe(key_b)[1] == 6
+
+
+def test_keeps_old_move_when_storing_without_one():
+    tt = TranspositionTable(1)
+    tt.store(99, 2, 10, LOWER, encode_move(1, 18))
+    tt.store(99, 3, -5, UPPER, NO_MOVE)
+    assert tt.probe(99)[4] == encode_move(1, 18)
+
+
+def test_clear():
+    tt = TranspositionTable(1)
+    tt.store(99, 2, 10, EXACT, NO_MOVE)
+    tt.clear()
+    assert tt.probe(99) is None
+
+
+def test_full_table_fits_in_hash_budget():
+    tt = TranspositionTable(1)
+    rng = random.Random(7)
+    tracemalloc.start()
+    try:
+        tt.resize(1)
+        for _ in range(len(tt.table) * 4):
+            tt.store(rng.getrandbits(64), rng.randint(1, 20), rng.randint(-3000, 3000),
+                     EXACT, encode_move(rng.randrange(64), rng.randrange(64)))
+        used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert used <= 1024 * 1024
+
+
+def test_hashfull_counts_current_search_entries():
+    tt = TranspositionTable(1)
+    assert tt.hashfull() == 0
+    for key in range(0, 1000, 2):
+        tt.store(key, 1, 0, EXACT, NO_MOVE)
+    assert tt.hashfull() == 250
+    tt.new_search()
+    assert tt.hashfull() == 0
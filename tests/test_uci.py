@@ -0,0 +1,138 @@
+import io
+import sys
+import threading
+import time
+
+from engine.fen import parse_fen
+from engine.output import send
+from engine.uci import SearchWorker, parse_go
+from engine import uci
+from engine.search import options, tt
+
+START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def _bestmoves(out):
+    return [l for l in out.splitlines() if l.startswith("bestmove")]
+
+
+def test_stop_ends_infinite_search(capsys):
+    worker = SearchWorker()
+    worker.start(parse_fen(START), parse_go("go infinite".split()))
+    time.sleep(0.2)
+    assert worker.is_searching()
+
+    start = time.perf_counter()
+    worker.stop()
+    assert time.perf_counter() - start < 0.5
+    assert not worker.is_searching()
+    assert len(_bestmoves(capsys.readouterr().out)) == 1
+
+
+def test_infinite_waits_for_stop_before_bestmove(capsys):
+    worker = SearchWorker()
+    # Depth 1 finishes at once, bestmove still has to wait for stop
+    worker.start(parse_fen(START), parse_go("go infinite depth 1".split()))
+    time.sleep(0.2)
+    assert _bestmoves(capsys.readouterr().out) == []
+    worker.stop()
+    assert len(_bestmoves(capsys.readouterr().out)) == 1
+
+
+def test_ponderhit_switches_to_timed_search(capsys):
+    worker = SearchWorker()
+    worker.start(parse_fen(START), parse_go("go ponder movetime 200".split()))
+    time.sleep(0.3)
+    # Still pondering, the movetime has not started counting
+    assert worker.is_searching()
+
+    worker.ponderhit()
+    worker.thread.join(timeout=2)
+    assert not worker.is_searching()
+    assert len(_bestmoves(capsys.readouterr().out)) == 1
+    worker.stop()
+
+
+def test_ponderhit_before_search_starts(monkeypatch, capsys):
+    gate = threading.Event()
+    real_search = uci.search
+
+    def gated_search(pos, **kwargs):
+        gate.wait()
+        return real_search(pos, **kwargs)
+
+    monkeypatch.setattr(uci, "search", gated_search)
+    worker = SearchWorker()
+    worker.start(parse_fen(START), parse_go("go ponder movetime 100".split()))
+    # ponderhit lands before the search thread has reset its limits
+    worker.ponderhit()
+    gate.set()
+    worker.thread.join(timeout=2)
+    assert not worker.is_searching()
+    assert len(_bestmoves(capsys.readouterr().out)) == 1
+    worker.stop()
+
+
+def test_search_leaves_gui_position_alone():
+    pos = parse_fen(START)
+    worker = SearchWorker()
+    worker.start(pos, parse_go("go depth 2".split()))
+    worker.stop()
+    assert pos.undo_ply == 0
+    assert pos.hash == parse_fen(START).hash
+
+
+def test_setoption_toggles_search_features(monkeypatch, capsys):
+    saved = (options.pvs, options.null_move, options.lmr)
+    commands = "uci\nsetoption name NullMove value false\nsetoption name lmr value false\nquit\n"
+    monkeypatch.setattr("sys.stdin", io.StringIO(commands))
+    try:
+        uci.uci_loop()
+        out = capsys.readouterr().out
+        assert "option name NullMove type check default true" in out
+        assert options.pvs and not options.null_move and not options.lmr
+    finally:
+        options.pvs, options.null_move, options.lmr = saved
+
+
+def test_bad_input_is_reported_and_ignored(monkeypatch, capsys):
+    commands = (
+        "position startpos moves e2e4\n"
+        "position startpos moves e2e4 zz\n"
+        "setoption name Hash value big\n"
+        "go perft x\n"
+        "go perft 1\n"
+        "quit\n"
+    )
+    monkeypatch.setattr("sys.stdin", io.StringIO(commands))
+    size_mb = tt.size_mb
+    uci.uci_loop()
+    out = capsys.readouterr().out
+    assert "info string Illegal move: zz" in out
+    assert "info string invalid Hash value: big" in out
+    assert "info string invalid perft depth: x" in out
+    assert tt.size_mb == size_mb
+    # Still on the position from before the bad command, black to move
+    assert "e7e5: 1" in out
+    assert "Nodes searched: 20" in out
+
+
+def test_output_lines_are_written_whole(monkeypatch):
+    writes = []
+
+    class Recorder:
+        def write(self, text):
+            writes.append(text)
+
+        def flush(self):
+            pass
+
+    monkeypatch.setattr(sys, "stdout", Recorder())
+    threads = [threading.Thread(target=lambda: [send("info depth 1") for _ in range(200)]) for _ in range(2)]
+    threads.append(threading.Thread(target=lambda: [send("readyok") for _ in range(200)]))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(writes) == 600
+    assert all(w in ("info depth 1\n", "readyok\n") for w in writes)
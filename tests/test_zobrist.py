@@ -0,0 +1,46 @@
+import random
+
+from engine import makeunmake
+from engine.fen import parse_fen
+from engine.makeunmake import make_move
+from engine.movegen import generate_legal_moves
+from engine.move import move_to_uci
+from engine.zobrist import hash_position, hash_pawns
+from helpers import random_walk
+
+START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+def test_fen_sets_hash():
+    pos = parse_fen(START)
+    assert pos.hash == hash_position(pos)
+
+
+def test_incremental_hash_matches_recompute(monkeypatch):
+    monkeypatch.setattr(makeunmake, "DEBUG_HASH", True)
+    rng = random.Random(42)
+
+    for fen in (START, KIWIPETE):
+        for _ in range(5):
+            for pos in random_walk(fen, 40, rng):
+                assert pos.hash == hash_position(pos)
+                assert pos.pawn_hash == hash_pawns(pos)
+
+
+def test_transposition_gives_same_hash():
+    a = parse_fen(START)
+    for uci in ("g1f3", "g8f6", "b1c3"):
+        make_move(a, next(m for m in generate_legal_moves(a) if move_to_uci(m) == uci))
+    b = parse_fen(START)
+    for uci in ("b1c3", "g8f6", "g1f3"):
+        make_move(b, next(m for m in generate_legal_moves(b) if move_to_uci(m) == uci))
+    assert a.hash == b.hash
+
+
+def test_pawn_hash_ignores_pieces():
+    a = parse_fen("4k3/pp6/8/8/8/8/PP6/R3K3 w - - 0 1")
+    b = parse_fen("3qk3/pp6/8/8/8/8/PP6/4K2N b - - 0 1")
+    assert a.pawn_hash == b.pawn_hash
+    c = parse_fen("4k3/pp6/8/8/8/1P6/P7/R3K3 w - - 0 1")
+    assert a.pawn_hash != c.pawn_hash